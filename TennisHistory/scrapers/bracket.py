@@ -0,0 +1,57 @@
+# Match-number geometry of a knockout draw, shared by the ATP and WTA draw parsers.
+# Both sites number matches from the last round backwards: the last round's matches come first (1, 2, ...),
+# then the round before it, and so on, so a round starts at 1 + the number of matches in every later round.
+# A full draw plays down to the final; a qualifying draw stops after `rounds` rounds, with one qualifier per last-round match.
+
+class Bracket:
+    def __init__(self, draw_size, rounds=None, byes=0):
+        # Byes fill the first round out to the bracket the site draws (e.g. 28 entrants + 4 byes = 32 lines)
+        self.size = draw_size + byes
+
+        sizes = []
+        matches = self.size // 2
+        while matches >= 1 and (rounds is None or len(sizes) < rounds):
+            sizes.append(matches)
+            matches //= 2
+        self.sizes = sizes
+
+        # First match number of each round, first round first
+        self.starts = [1 + sum(sizes[index + 1:]) for index in range(len(sizes))]
+
+    @property
+    def rounds(self):
+        return len(self.sizes)
+
+    # Match number of the match at `position` (0-based, top to bottom) in round `round_index` (0 = first round)
+    def match_no(self, round_index, position):
+        return self.starts[round_index] + position
+
+    # Round index and position of a match number
+    def locate(self, match_no):
+        for round_index in range(self.rounds - 1, -1, -1):
+            position = match_no - self.starts[round_index]
+            if 0 <= position < self.sizes[round_index]:
+                return round_index, position
+        raise ValueError(f"Match {match_no} is not in a {self.size} draw with {self.rounds} rounds")
+
+    # The two earlier matches whose winners meet in this one, or None in the first round
+    def feeders(self, match_no):
+        round_index, position = self.locate(match_no)
+        if round_index == 0:
+            return None
+        return self.match_no(round_index - 1, 2 * position), self.match_no(round_index - 1, 2 * position + 1)
+
+    # Where the winner of this match goes: (match number, 1 for the top line or 2 for the bottom), or None from the last round
+    def next_match(self, match_no):
+        round_index, position = self.locate(match_no)
+        if round_index == self.rounds - 1:
+            return None
+        return self.match_no(round_index + 1, position // 2), position % 2 + 1
+
+    # Winner progression for the whole draw: {match number: (next match number, line)}
+    def progression(self):
+        return {
+            self.match_no(round_index, position): (self.match_no(round_index + 1, position // 2), position % 2 + 1)
+            for round_index in range(self.rounds - 1)
+            for position in range(self.sizes[round_index])
+        }
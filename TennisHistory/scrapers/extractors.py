@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import metrics
+
+# Set FETCH_EXTRACT=off to store rendered HTML fragments instead of extracted fields
+EXTRACT_ENABLED = os.getenv("FETCH_EXTRACT", "on") != "off"
+
+# Text of an element the way BeautifulSoup's get_text(strip=True) reads it: every text node stripped, then joined
+TEXT_HELPER = """
+    const text = (node) => {
+        if (!node) return null;
+        const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+        let out = '';
+        while (walker.nextNode()) out += walker.currentNode.nodeValue.trim();
+        return out;
+    };
+"""
+
+# Rows of the WTA Service stats block as [player 1, label, player 2], or null when the match has no stats
+WTA_SERVICE_HELPER = """
+    const serviceRows = () => {
+        const stats = document.querySelector('#match-stats div.js-match-stats');
+        const heading = stats && Array.from(stats.querySelectorAll('h3')).find((h3) => h3.textContent === 'Service');
+        if (!heading) return null;
+        let list = heading.nextElementSibling;
+        while (list && !list.matches('div.compare-stats-block__list')) list = list.nextElementSibling;
+        if (!list) return null;
+        return Array.from(list.querySelectorAll('div.compare-stats-block__row')).map(
+            (row) => Array.from(row.querySelectorAll('div.compare-stats-block__content-col')).map(text)
+        );
+    };
+"""
+
+# In-page extractors per page type. Each returns only the raw fields its parser reads, so a rendered page
+# crosses the WebDriver wire once as a small JSON object instead of as HTML to be parsed again.
+# Parsers accept either form (see atp_stats_fields / wta_match_fields / wta_stats_fields)
+EXTRACTORS = {
+    'atp_stats': TEXT_HELPER + """
+        const root = document.querySelector('.atp_layout-container');
+        const links = (team) => {
+            const container = root.querySelector(`#Stat-header ${team}`);
+            return container ? Array.from(container.querySelectorAll('.name a')).map((a) => a.getAttribute('href') || '') : [];
+        };
+        return {
+            team1: links('.team1'),
+            team2: links('.team2'),
+            stats: Array.from(root.querySelectorAll('div.desktopView')).map((stat) => ({
+                label: text(stat.querySelector('div.labelWrappper')),
+                p1: text(stat.querySelector('div.player1')),
+                p2: text(stat.querySelector('div.player2')),
+                speed1: text(stat.querySelector('div.speedkmh1')),
+                speed2: text(stat.querySelector('div.speedkmh2'))
+            }))
+        };
+    """,
+    'wta_match': TEXT_HELPER + WTA_SERVICE_HELPER + """
+        const live = document.querySelector('section.mc-live-score');
+        return {
+            player_ids: live.getAttribute('data-player-ids'),
+            status_time: text(live.querySelector('div.tennis-match__status-time')),
+            details: Array.from(document.querySelectorAll('#match-details div.match-info__row')).map((row) => ({
+                title: text(row.querySelector('div.match-info__title')),
+                value: text(row.querySelector('div.match-info__value'))
+            })),
+            service: serviceRows()
+        };
+    """,
+    'wta_stats': TEXT_HELPER + WTA_SERVICE_HELPER + """
+        const script = document.querySelector('header.page-hero script[type="application/ld+json"]');
+        return {
+            ld_json: script ? script.textContent : null,
+            service: serviceRows()
+        };
+    """
+}
+
+# Run a page type's extractor in the browser and return its fields as the JSON body to store
+def extract(driver, page_type):
+    started = time.monotonic()
+    fields = driver.execute_script(EXTRACTORS[page_type])
+    metrics.record_timing(f"extract.{page_type}", time.monotonic() - started)
+    return json.dumps(fields)
+
+def has_extractor(page_type):
+    return EXTRACT_ENABLED and page_type in EXTRACTORS
@@ -1,4 +1,6 @@
+import os
 from server import app
+from browser import driver_pool
 import players
 import draws
 import results
@@ -7,4 +9,7 @@ import matches
 if __name__ == "__main__":
     # Optional: print to verify routes are loaded
     print(app.url_map)
+    # Pre-spawn browsers in the process that serves requests, not the reloader parent
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        driver_pool.warm()
     app.run(debug=True, host="127.0.0.1", port=5001)
\ No newline at end of file
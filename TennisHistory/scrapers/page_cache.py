@@ -0,0 +1,157 @@
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import threading
+from datetime import date
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import metrics
+
+# Cache location and size bound (least recently used pages are evicted past the bound)
+CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".page_cache"))
+CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_MB", "1024")) * 1024 * 1024
+CACHE_ENABLED = os.getenv("PAGE_CACHE", "on") != "off"
+
+# Retention: pages for past seasons never change, current-season pages go stale quickly,
+# pages without a season (player profiles) are refreshed daily
+CURRENT_TTL = int(os.getenv("PAGE_CACHE_CURRENT_TTL", str(6 * 3600)))
+DEFAULT_TTL = int(os.getenv("PAGE_CACHE_DEFAULT_TTL", str(24 * 3600)))
+# Pages whose render ended on a quiet network without the data appearing (the waits.py 'idle' outcome) may
+# just have been slow, so they are kept briefly whatever their season rather than replayed empty for good
+INCOMPLETE_TTL = int(os.getenv("PAGE_CACHE_INCOMPLETE_TTL", str(15 * 60)))
+
+_lock = threading.Lock()
+_total_bytes = None
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+def cache_key(url, page_type):
+    return hashlib.sha256(f"{page_type} {normalize_url(url)}".encode()).hexdigest()
+
+def ttl_for(url):
+    years = [int(year) for year in re.findall(r'(?<!\d)((?:19|20)\d{2})(?!\d)', url)]
+    if not years:
+        return DEFAULT_TTL
+    if max(years) < date.today().year:
+        return None
+    return CURRENT_TTL
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.gz")
+
+# Each entry is a gzip file holding one JSON header line followed by the page body
+def read_entry(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        body = f.read()
+    return header, body
+
+def get(url, page_type):
+    if not CACHE_ENABLED:
+        return None
+
+    path = _path(cache_key(url, page_type))
+    try:
+        header, body = read_entry(path)
+    except (FileNotFoundError, OSError, ValueError):
+        metrics.increment('page_cache.miss')
+        metrics.increment(f"page_cache.{page_type}.miss")
+        return None
+
+    if header.get('expires_at') is not None and header['expires_at'] < time.time():
+        metrics.increment('page_cache.expired')
+        metrics.increment(f"page_cache.{page_type}.expired")
+        return None
+
+    # Touch the entry so eviction sees it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    metrics.increment('page_cache.hit')
+    metrics.increment(f"page_cache.{page_type}.hit")
+    return body
+
+# The context is whatever the page's parser needs besides the HTML, so the page can be replayed offline.
+# ready is False when the page was stored without the elements its parser reads
+def put(url, page_type, body, context=None, ready=True):
+    if not CACHE_ENABLED:
+        return
+
+    ttl = ttl_for(url) if ready else INCOMPLETE_TTL
+    if not ready:
+        metrics.increment(f"page_cache.{page_type}.incomplete")
+    now = time.time()
+    header = {
+        'url': url,
+        'page_type': page_type,
+        'context': context or {},
+        'ready': ready,
+        'fetched_at': now,
+        'expires_at': now + ttl if ttl is not None else None
+    }
+
+    path = _path(cache_key(url, page_type))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(header) + '\n')
+        f.write(body)
+
+    previous = os.path.getsize(path) if os.path.exists(path) else 0
+    os.replace(tmp_path, path)
+    _account(os.path.getsize(path) - previous)
+
+def _scan(cache_dir=None):
+    for root, _, files in os.walk(cache_dir or CACHE_DIR):
+        for name in files:
+            if name.endswith('.gz'):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+def entries(cache_dir=None):
+    for path, _, _ in _scan(cache_dir):
+        yield path
+
+def _account(delta):
+    global _total_bytes
+    with _lock:
+        if _total_bytes is None:
+            _total_bytes = sum(size for _, size, _ in _scan())
+        else:
+            _total_bytes += delta
+        if _total_bytes <= CACHE_MAX_BYTES:
+            return
+
+        # Evict least recently used entries down to 90% of the bound
+        for path, size, _ in sorted(_scan(), key=lambda entry: entry[2]):
+            if _total_bytes <= CACHE_MAX_BYTES * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            _total_bytes -= size
+            metrics.increment('page_cache.evicted')
+
+def cache_stats():
+    with _lock:
+        return {
+            'enabled': CACHE_ENABLED,
+            'dir': CACHE_DIR,
+            'bytes': _total_bytes,
+            'max_bytes': CACHE_MAX_BYTES
+        }
+
+metrics.register_gauge('page_cache', cache_stats)
@@ -0,0 +1,73 @@
+import os
+import importlib
+from bs4 import BeautifulSoup, SoupStrainer
+
+# How parsers build their trees
+#   html.parser: BeautifulSoup's pure-Python builder (the default, no extra dependency)
+#   lxml:        BeautifulSoup over the lxml C builder
+#   selectolax:  selectolax's Lexbor CSS engine cuts the needed subtrees out of the page, and only those are built with lxml
+#                (its older Modest engine, selectolax.parser, is gone from selectolax 1.0)
+# Set with PARSE_BACKEND, or per process with use() (replay.py --backend / --compare)
+PARSE_BACKEND = os.getenv("PARSE_BACKEND", "html.parser")
+BUILDERS = {
+    'html.parser': 'html.parser',
+    'lxml': 'lxml',
+    'selectolax': 'lxml'
+}
+REQUIRES = {
+    'html.parser': [],
+    'lxml': ['lxml'],
+    'selectolax': ['selectolax.lexbor', 'lxml']
+}
+
+_backend = PARSE_BACKEND
+
+def use(name):
+    global _backend
+    if name not in BUILDERS:
+        raise ValueError(f"Unknown parse backend {name}, expected one of {', '.join(BUILDERS)}")
+    # Import, rather than only look for, each module: an installed package can still lack the module a backend uses
+    for module in REQUIRES[name]:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            raise ValueError(f"Parse backend {name} needs {module}, which can't be imported: {e}")
+    _backend = name
+
+def current():
+    return _backend
+
+def make_soup(html):
+    return BeautifulSoup(html, BUILDERS[_backend])
+
+# Parse only the elements with this class (outermost matches, in page order) instead of the whole page
+def subtrees(html, class_, name=None):
+    if _backend == 'selectolax':
+        from selectolax.lexbor import LexborHTMLParser
+        nodes = LexborHTMLParser(html).css(f"{name or ''}.{class_}")
+        # Nested matches are already inside their outermost match
+        outermost = []
+        for node in nodes:
+            if not any(is_inside(node, parent) for parent in outermost):
+                outermost.append(node)
+        return [BeautifulSoup(node.html, BUILDERS[_backend]).find(name, class_=class_) for node in outermost]
+
+    soup = BeautifulSoup(html, BUILDERS[_backend], parse_only=SoupStrainer(name, class_=class_))
+    return soup.find_all(name, class_=class_, recursive=False)
+
+def subtree(html, class_, name=None):
+    trees = subtrees(html, class_, name)
+    return trees[0] if trees else None
+
+def is_inside(node, ancestor):
+    parent = node.parent
+    while parent is not None:
+        if parent.mem_id == ancestor.mem_id:
+            return True
+        parent = parent.parent
+    return False
+
+# Free a tree as soon as its record is built, rather than keeping every subtree of the page alive until the parser returns
+def release(tree):
+    if tree is not None:
+        tree.decompose()
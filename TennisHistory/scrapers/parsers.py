@@ -0,0 +1,923 @@
+import re
+import json
+from html import escape
+from bracket import Bracket
+from parse_backend import make_soup, subtree, subtrees, release
+from datetime import datetime
+from lib import round_name_mapping, extract_atp_id_from_link
+
+# Parsers turn a stored page into the records its endpoint writes. They only need the HTML and the
+# request context saved with it, so pages can be re-parsed offline without a browser (see replay.py)
+
+# Matches in a main draw round, from its name
+def main_round_matches(round_name):
+    return {'Final': 1, 'Semifinals': 2, 'Quarterfinals': 4}.get(round_name) or int(round_name.removeprefix('Round of ')) // 2
+
+# Bracket index of a round: qualifying rounds are numbered by name, main draw rounds by how many matches they hold
+def atp_round_index(bracket, round_name):
+    if round_name.startswith('Qualifying round'):
+        return int(round_name.removeprefix('Qualifying round ')) - 1
+    return bracket.sizes.index(main_round_matches(round_name))
+
+# Bracket of the draw on the page: a qualifying draw runs to the last round the page shows and, unless the request
+# gives its size, has two lines per first-round match; a main draw is sized by its largest round
+def atp_draw_bracket(rounds, draw_size, event):
+    qualifying = [(name, round) for name, round in rounds if name.startswith('Qualifying round')]
+    if qualifying:
+        round_count = max(int(name.removeprefix('Qualifying round ')) for name, _ in qualifying)
+        if draw_size:
+            return Bracket(draw_size, round_count)
+        first_round = next((round for name, round in qualifying if name == 'Qualifying round 1'), None)
+        if first_round is None:
+            raise ValueError(f"Qualifying draw of {event} has no first round to size it by; give its draw_size")
+        return Bracket(2 * len(first_round.find_all('div', class_='draw-stats')), round_count)
+    return Bracket(2 * max(main_round_matches(name) for name, _ in rounds))
+
+def parse_atp_draw(html, context):
+    event_id = context['event_id']
+    match_type = context['match_type']
+    draw = context['draw']
+    draw_size = context.get('draw_size')
+    match_format = context.get('format')
+
+    matches = []
+    entries = {}
+    player_entry_mapping = {}
+    seeds = {}
+    statuses = {}
+
+    soup = subtree(html, 'atp-draw-container')
+
+    rounds = [
+        (round_name_mapping[round.find('div', class_='draw-header').get_text(strip=True)], round)
+        for round in soup.find_all('div', class_='draw')
+    ]
+    bracket = atp_draw_bracket(rounds, draw_size, event_id)
+
+    for round_name, round in rounds:
+        # Get matches
+        match_no = bracket.match_no(atp_round_index(bracket, round_name), 0)
+        round_matches = round.find_all('div', class_='draw-stats')
+        for match in round_matches:
+            match_info = {
+                'match_no': match_no,
+                'round': round_name,
+                'tour': 'ATP',
+                'match_type': match_type,
+                'draw': draw,
+                'format': match_format
+            }
+
+            match_no += 1
+
+            teams = match.find_all('div', class_ = 'player-info')
+
+            for index, team in enumerate(teams):
+                players = team.find_all('div', class_ = 'name')
+
+                entry_id = f"{event_id}"
+                entry_info = {}
+                player_ids = []
+
+                for idx, player in enumerate(players):
+                    player_text = player.get_text(strip=True)
+
+                    if player_text in ('Bye', 'Bye1'):
+                        match_info['incomplete'] = 'B'
+                    elif not player_text in ('Qualifier', 'TBA', 'Alternate'):
+                        player_link = player.find('a')
+                        player_id = extract_atp_id_from_link(player_link['href'])
+
+                        entry_id += f" {player_id}"
+                        player_ids.append(player_id)
+
+                    # Get seed and status if first player in team
+                    if idx == 0:
+                        entry_info_tag = player.find('span')
+
+                        if entry_info_tag:
+                            entry_info_text = entry_info_tag.get_text(strip=True).strip("()")
+
+                            # Extract seed
+                            seed_text = re.search(r'\d+', entry_info_text)
+                            if seed_text:
+                                entry_info['seed'] = int(seed_text.group())
+
+                            # Extract status
+                            status_text = re.search(r'[A-Za-z]+', entry_info_text)
+                            if status_text:
+                                entry_info['status'] = status_text.group().replace('Alt', 'AL')
+
+                if len(player_ids):
+                    match_info[f"team_{index + 1}_id"] = entry_id
+
+                    entries[entry_id] = {
+                        'id': entry_id,
+                        'match_type': match_type,
+                        'event_id': event_id
+                    }
+
+                    for id in player_ids:
+                        player_entry_mapping[id] = {
+                            'player_id': id,
+                            'entry_id': entry_id
+                        }
+
+                    if entry_info.get('seed'):
+                        seeds[entry_id] = {
+                            'event_id': event_id,
+                            'entry_id': entry_id,
+                            'seed': entry_info['seed'],
+                            'draw': draw,
+                            'match_type': match_type
+                        }
+
+                    if entry_info.get('status'):
+                        statuses[entry_id] = {
+                            'event_id': event_id,
+                            'entry_id': entry_id,
+                            'status': entry_info['status'],
+                            'draw': draw
+                        }
+
+            matches.append(match_info)
+
+        release(round)
+
+    return {
+        'matches': matches,
+        'entries': list(entries.values()),
+        'mappings': list(player_entry_mapping.values()),
+        'seeds': list(seeds.values()),
+        'statuses': list(statuses.values())
+    }
+
+def parse_wta_draw(html, context):
+    event_id = context['event_id']
+
+    matches = []
+    entries = {}
+    player_entry_mapping = {}
+    seeds = {}
+    scores = []
+
+    draw_mapping = {
+        'LS': ['Main', 'Singles'],
+        'LD': ['Main', 'Doubles'],
+        'RS': ['Qualifying', 'Singles']
+    }
+
+    # Each draw tab is parsed on its own and freed once its matches are read
+    draw_containers = subtrees(html, 'tournament-draw__tab', 'div')
+
+    for draw_layout in draw_containers:
+        draw_type = draw_layout.get('data-event-type')
+
+        round_mapping = {
+            128: 'Round of 128',
+            64: 'Round of 64',
+            32: 'Round of 32',
+            16: 'Round of 16',
+            8: 'Quarterfinals',
+            4: 'Semifinals',
+            2: 'Final'
+        }
+
+        rounds = draw_layout.find_all('div', class_ = 'tournament-draw__round-container')
+
+        # data-round is the number of players in the round, so the largest one sizes the bracket;
+        # a qualifying (RS) draw stops after the rounds shown
+        first_round = max((int(round.get('data-round')) for round in rounds), default=0)
+        bracket = Bracket(first_round, len(rounds) if draw_type == 'RS' else None)
+
+        for idx, round in enumerate(rounds):
+            round_number = int(round.get('data-round'))
+            round_name = round_mapping.get(round_number) if draw_type != 'RS' else f"Qualifying round {idx + 1}"
+
+            matches_container = round.find_all('div', class_ = 'tournament-draw__match-table')
+
+            for index, match_container in enumerate(matches_container):
+                match_no = bracket.match_no(idx if draw_type == 'RS' else bracket.sizes.index(round_number // 2), index)
+
+                match_info = {
+                    'match_no': match_no,
+                    'round': round_name,
+                    'tour': 'WTA',
+                    'match_type': draw_mapping[draw_type][1],
+                    'draw': draw_mapping[draw_type][0],
+                    'format': 3
+                }
+
+                match = match_container.find('div', class_ = 'js-tennis-match-wta')
+                if match:
+                    winner_id = f"{event_id}"
+                    singles_winner_id = match.get('data-winner-id')
+                    doubles_winner_id = match.get('data-double-winner-id')
+
+                    if singles_winner_id:
+                        winner_id += f" {singles_winner_id}"
+
+                    if doubles_winner_id:
+                        winner_id += f" {doubles_winner_id}"
+
+                    match_info['winner_id'] = winner_id
+
+                    player_rows = match.find_all('tr', class_ = 'match-table__row')
+
+                    for i, player_row in enumerate(player_rows):
+                        player_data_ids = player_row.get('data-player-row-id')
+                        if player_data_ids == 'player':
+                            match_info['incomplete'] = 'B'
+                        else:
+                            player_ids = player_data_ids.removeprefix('player-').split('-')
+                            entry_id = f"{event_id} {(' ').join(player_ids)}"
+                            match_info[f"team_{i + 1}_id"] = entry_id
+
+                            entries[entry_id] = {
+                                'id': entry_id,
+                                'match_type': draw_mapping[draw_type][1],
+                                'event_id': event_id
+                            }
+
+                            for p in player_ids:
+                                player_entry_mapping[f"{p} {entry_id}"] = {
+                                    'player_id': p,
+                                    'entry_id': entry_id
+                                }
+
+                            seed_tag = player_row.find('span', class_ = 'match-table__player-seed')
+
+                            if seed_tag:
+                                seed_text = seed_tag.get_text(strip=True).strip("()")
+                                seeds[entry_id] = {
+                                    'event_id': event_id,
+                                    'entry_id': entry_id,
+                                    'seed': int(seed_text) if seed_text.isdigit() else None,
+                                    'draw': draw_mapping[draw_type][0],
+                                    'match_type': draw_mapping[draw_type][1]
+                                }
+
+                            for j in range(1, 4):
+                                score_tag = player_row.find('td', class_ = f"js-score-set-{j}{'a' if i == 0 else 'b'}")
+
+                                if score_tag:
+                                    score_info = {
+                                        'entry_id': entry_id,
+                                        'set_no': j,
+                                        'match_no': match_no,
+                                        'draw': draw_mapping[draw_type][0],
+                                        'match_type': draw_mapping[draw_type][1]
+                                    }
+
+                                    # Extract tie-break text if it exists
+                                    tb_tag = score_tag.find('sup', class_="match-table__tie-break")
+                                    if tb_tag:
+                                        tb_text = tb_tag.get_text(strip=True)
+                                        score_info['tb'] = int(tb_text) if tb_text.isdigit() else None
+                                        tb_tag.decompose()  # Remove the <sup> tag from score_tag so it doesn't affect .get_text()
+
+                                    score_text = score_tag.get_text(strip=True)
+                                    if score_text:
+                                        score_info['set'] = int(score_text) if score_text.isdigit() else None
+
+                                    if score_info.get('set'):
+                                        scores.append(score_info)
+
+                if match_info.get('team_1_id') and match_info.get('team_2_id'):
+                    match_info['loser_id'] = match_info['team_1_id'] if match_info['winner_id'] == match_info['team_2_id'] else match_info['team_2_id']
+                matches.append(match_info)
+
+        release(draw_layout)
+
+    return {
+        'matches': matches,
+        'entries': list(entries.values()),
+        'mappings': list(player_entry_mapping.values()),
+        'seeds': list(seeds.values()),
+        'scores': scores
+    }
+
+def parse_atp_results(html, context):
+    matches = []
+    links = []
+
+    # Each day's accordion item is parsed on its own and freed once its matches are read
+    containers = subtrees(html, 'atp_accordion-item', 'div')
+
+    for container in containers:
+        date_container = container.find('h4')
+        date_obj = None
+        if date_container:
+            stripped_date = re.match(r"([A-Za-z]{3}, \d{2} [A-Za-z]+, \d{4})", date_container.get_text(strip=True))
+            date_obj = datetime.strptime(stripped_date.group(1), "%a, %d %B, %Y") if stripped_date else None
+
+        matches_details = container.find_all('div', class_='match')
+
+        for match in matches_details:
+
+            # Get match details
+            header_div = match.find('div', class_='match-header')
+            match_headers = header_div.find_all('span')
+
+            match_header = match_headers[0].get_text(strip=True)
+            parts = [p.strip() for p in match_header.split(' - ', 1)]
+            round_name = round_name_mapping.get(parts[0])
+            court_name = parts[1] if len(parts) > 1 else None
+            match_time = match_headers[1].get_text(strip=True) if len(match_headers) > 1 else '00:00:00'
+
+            match_detail = {
+                'round': round_name,
+                'court': court_name,
+                'duration': match_time,
+                'date': date_obj.strftime("%Y-%m-%d") if date_obj is not None else None,
+                'sets': []
+            }
+
+            if date_obj is not None:
+                match_detail['date'] = date_obj.strftime("%Y-%m-%d")
+
+            # Get umpire
+            umpire_container = match.find('div', class_='match-umpire')
+            if umpire_container:
+                umpire_text = umpire_container.get_text(strip=True).removeprefix('Ump: ')
+                if umpire_text != "":
+                    match_detail['umpire'] = umpire_text
+
+            players_container = match.find_all('div', class_='name')
+
+            for idx, player in enumerate(players_container):
+                link = player.find('a')
+                if link.get_text(strip=True) == 'Bye':
+                    match_detail["bye"] = True
+                else:
+                    id = re.search("/([a-zA-Z0-9]{4})/", link['href'])
+                    # if id is None:
+                    #     if link.get_text(strip=True) == 'Marcus Willis':
+                    #         match_detail[f"p{idx + 1}"] = 'w521'
+                    # else:
+                    match_detail[f"p{idx + 1}"] = id.group(1)
+
+            # Get scores
+            scores_container = match.find_all('div', class_='scores')
+            for idx, score_container in enumerate(scores_container):
+                scores_items = score_container.find_all('div', class_='score-item')
+                setNumber = 0
+                for i, score in enumerate(scores_items):
+                    spans = score.find_all('span')
+                    if (len(spans) > 0):
+                        match_detail['sets'].append({
+                            'set_no': setNumber + i + 1,
+                            'set': int(spans[0].get_text(strip=True)),
+                            'tb': int(spans[1].get_text(strip=True)) if len(spans) > 1 else None,
+                            'entry_id': 'p1' if idx == 0 else 'p2'
+                        })
+                    else:
+                        setNumber -= 1
+
+            try:
+                stats_link = match.find('a', string='Stats').get('href')
+                links.append(stats_link)
+            except:
+                pass
+
+            matches.append(match_detail)
+
+        release(container)
+
+    return {'matches': matches, 'links': links}
+
+# Fields the stats parser reads: the JSON stored by the in-browser extractor (extractors.py), or the same fields read from HTML
+def atp_stats_fields(html):
+    if html.lstrip().startswith('{'):
+        return json.loads(html)
+
+    soup = subtree(html, 'atp_layout-container')
+    players_container = soup.find(id="Stat-header")
+
+    def links(team):
+        container = players_container.select_one(team)
+        return [link.get('href', '') for link in container.select('.name a')] if container else []
+
+    def text(stat, class_):
+        tag = stat.find('div', class_=class_)
+        return tag.get_text(strip=True) if tag else None
+
+    return {
+        'team1': links('.team1'),
+        'team2': links('.team2'),
+        'stats': [
+            {
+                'label': text(stat, 'labelWrappper'),
+                'p1': text(stat, 'player1'),
+                'p2': text(stat, 'player2'),
+                'speed1': text(stat, 'speedkmh1'),
+                'speed2': text(stat, 'speedkmh2')
+            }
+            for stat in soup.find_all('div', class_='desktopView')
+        ]
+    }
+
+def parse_atp_stats(html, context):
+    fields = atp_stats_fields(html)
+
+    match_info = {
+        'p1': {},
+        'p2': {}
+    }
+
+    # Get players
+    def extract_team_id(links):
+        ids = [
+            match.group(1).lower()
+            for link in links
+            if (match := re.search(r'/([a-zA-Z0-9]{4})/', link))
+        ]
+        return f"{context['event_id']} {' '.join(ids)}"
+
+    team1_id = extract_team_id(fields['team1'])
+    team2_id = extract_team_id(fields['team2'])
+    match_info['p1']['entry_id'] = team1_id
+    match_info['p2']['entry_id'] = team2_id
+
+    # Get stats
+    stats_dictionary = {
+        'Aces': 'aces',
+        'Double Faults': 'dfs',
+        '1st serve points won': ['serve1_w', 'serve1', 'ret1_w', 'ret1'],
+        '2nd serve points won': ['serve2_w', 'serve2', 'ret2_w', 'ret2'],
+        'Break Points Saved': ['bps_saved', 'bps_faced', 'bps_converted', 'bp_opps'],
+        'Net points won': ['net_w', 'net'],
+        'Winners': 'winners',
+        'Unforced Errors': 'ues',
+        'Max Speed': 'max_speed',
+        '1st Serve Average Speed': 'avg1_speed',
+        '2nd Serve Average Speed': 'avg2_speed',
+        'Service Games Played': 'serve_games',
+        'Return Games Played': 'return_games'
+    }
+    for stat in fields['stats']:
+        stat_label = stat['label']
+        if stats_dictionary.get(stat_label) is not None:
+            if stat_label in ('Max Speed', '1st Serve Average Speed', '2nd Serve Average Speed'):
+                key = stats_dictionary[stat_label]
+                p1_stat = stat['speed1']
+                p2_stat = stat['speed2']
+                match_info['p1'][key] = int(re.search(r'\d{2,3}', p1_stat).group()) if re.search(r'\d{2,3}', p1_stat) is not None else None
+                match_info['p2'][key] = int(re.search(r'\d{2,3}', p2_stat).group()) if re.search(r'\d{2,3}', p2_stat) is not None else None
+            else:
+                p1_stat = stat['p1']
+                p2_stat = stat['p2']
+                if stat_label in ('Aces', 'Double Faults', 'Winners', 'Unforced Errors', 'Service Games Played', 'Return Games Played'):
+                    key = stats_dictionary[stat_label]
+                    match_info['p1'][key] = int(p1_stat)
+                    match_info['p2'][key] = int(p2_stat)
+                elif stat_label == 'Net points won':
+                    key1, key2 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                else:
+                    key1, key2, key3, key4 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key3] = int(p1_stripped.group(2)) - int(p1_stripped.group(1))
+                    match_info['p2'][key4] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                    match_info['p1'][key3] = int(p2_stripped.group(2)) - int(p2_stripped.group(1))
+                    match_info['p1'][key4] = int(p2_stripped.group(2))
+
+    return match_info
+
+def parse_old_atp_stats(html, context):
+    soup = subtree(html, 'atp_match-stats')
+
+    match = {
+        't1': {},
+        't2': {}
+    }
+
+    # Get players
+    player_1_box = soup.find('div', class_='player-team')
+    player_2_box = soup.find('div', class_='opponent-team')
+
+    player_1_link = player_1_box.find('a')
+    player_2_link = player_2_box.find('a')
+
+    player_1_id = re.search(r'/([a-zA-Z0-9]{4})/', player_1_link['href']).group(1)
+    player_2_id = re.search(r'/([a-zA-Z0-9]{4})/', player_2_link['href']).group(1)
+
+    match['t1']['entry_id'] = f"{context['event_id']} {player_1_id}"
+    match['t2']['entry_id'] = f"{context['event_id']} {player_2_id}"
+
+    # Get stats
+    stats_dictionary = {
+        'Aces': 'aces',
+        'Double Faults': 'dfs',
+        '1st Serve Points Won': ['serve1_w', 'serve1', 'ret1_w', 'ret1'],
+        '2nd Serve Points Won': ['serve2_w', 'serve2', 'ret2_w', 'ret2'],
+        'Break Points Saved': ['bps_saved', 'bps_faced', 'bps_converted', 'bp_opps'],
+        'Net points won': ['net_w', 'net'],
+        'Winners': 'winners',
+        'Unforced Errors': 'ues',
+        'Max Speed': 'max_speed',
+        '1st Serve Average Speed': 'avg1_speed',
+        '2nd Serve Average Speed': 'avg2_speed',
+        'Service Games Played': 'serve_games',
+        'Return Games Played': 'return_games'
+    }
+
+    match_stats_container = soup.find('div', class_='stas-internal--match')
+
+    stats_items = match_stats_container.find_all('li')
+
+    for stat in stats_items:
+        stat_label = stat.find('div', class_='stats-item-legend').get_text(strip=True)
+
+        if stats_dictionary.get(stat_label) is not None:
+            if stat_label in ('Max Speed', '1st Serve Average Speed', '2nd Serve Average Speed'):
+                key = stats_dictionary[stat_label]
+                p1_stat = stat.find('div', class_='speedkmh1').get_text(strip=True)
+                p2_stat = stat.find('div', class_='speedkmh2').get_text(strip=True)
+                match['t1'][key] = int(re.search(r'\d{2,3}', p1_stat).group())
+                match['t2'][key] = int(re.search(r'\d{2,3}', p2_stat).group())
+            else:
+                p1_stat_container = stat.find('div', class_='player-stats-item')
+                p1_stat = p1_stat_container.find('div', class_='value').get_text(strip=True)
+                p2_stat_container = stat.find('div', class_='opponent-stats-item')
+                p2_stat = p2_stat_container.find('div', class_='value').get_text(strip=True)
+                if stat_label in ('Aces', 'Double Faults', 'Winners', 'Unforced Errors', 'Service Games Played', 'Return Games Played'):
+                    key = stats_dictionary[stat_label]
+                    match['t1'][key] = int(p1_stat) if p1_stat else 0
+                    match['t2'][key] = int(p2_stat) if p2_stat else 0
+                elif stat_label == 'Net points won':
+                    key1, key2 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match['t1'][key1] = int(p1_stripped.group(1))
+                    match['t1'][key2] = int(p1_stripped.group(2))
+                    match['t2'][key1] = int(p2_stripped.group(1))
+                    match['t2'][key2] = int(p2_stripped.group(2))
+                else:
+                    key1, key2, key3, key4 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match['t1'][key1] = int(p1_stripped.group(1)) if p1_stripped else 0
+                    match['t1'][key2] = int(p1_stripped.group(2)) if p1_stripped else 0
+                    match['t2'][key3] = int(p1_stripped.group(2)) - int(p1_stripped.group(1)) if p1_stripped else 0
+                    match['t2'][key4] = int(p1_stripped.group(2)) if p1_stripped else 0
+                    match['t2'][key1] = int(p2_stripped.group(1)) if p2_stripped else 0
+                    match['t2'][key2] = int(p2_stripped.group(2)) if p2_stripped else 0
+                    match['t1'][key3] = int(p2_stripped.group(2)) - int(p2_stripped.group(1)) if p2_stripped else 0
+                    match['t1'][key4] = int(p2_stripped.group(2)) if p2_stripped else 0
+
+    return match
+
+def get_wta_ids(competitor):
+    player_link = competitor.get('@id')
+    if not player_link:
+        return None
+
+    try:
+        return player_link.split('/players/')[1].split('/')[0]
+    except:
+        return None
+
+# Rows of the Service stats block as [player 1, label, player 2], or None when the match has no stats
+def wta_service_rows(match_stats_soup):
+    match_stats = match_stats_soup.find('div', class_ = 'js-match-stats')
+    service_stats = match_stats.find('h3', string= 'Service')
+    if not service_stats:
+        return None
+
+    stats_block = service_stats.find_next_sibling('div', class_ = 'compare-stats-block__list')
+    return [
+        [column.get_text(strip=True) for column in row.find_all('div', class_ = 'compare-stats-block__content-col')]
+        for row in stats_block.find_all('div', class_ = 'compare-stats-block__row')
+    ]
+
+# Fields the stats parser reads: the JSON stored by the in-browser extractor (extractors.py), or the same fields read from HTML
+def wta_stats_fields(html):
+    if html.lstrip().startswith('{'):
+        return json.loads(html)
+
+    page = make_soup(html)
+    script_block = page.select_one('header.page-hero').find('script', type='application/ld+json')
+
+    return {
+        'ld_json': script_block.string if script_block else None,
+        'service': wta_service_rows(page.find(id='match-stats'))
+    }
+
+def parse_wta_stats(html, context):
+    fields = wta_stats_fields(html)
+
+    match_info = {
+        'p1': {},
+        'p2': {}
+    }
+
+    # Get match details
+    if fields['ld_json']:
+        details_json = json.loads(fields['ld_json'])
+        competitors = details_json.get('performer')
+        date = details_json.get('endDate')
+        additional_info = details_json.get('additionalProperty')
+
+        if date:
+            match_info['date'] = date
+
+        if competitors:
+            team1 = competitors[0:len(competitors)//2]
+            entry_1_id = f"{context['event_id']} {' '.join([get_wta_ids(competitor) for competitor in team1])}"
+            match_info['team_1_id'] = entry_1_id
+
+            team2 = competitors[len(competitors)//2:]
+            entry_2_id = f"{context['event_id']} {' '.join([get_wta_ids(competitor) for competitor in team2])}"
+            match_info['team_2_id'] = entry_2_id
+
+        if additional_info:
+            # Get court
+            court = next((info for info in additional_info if info['name'] == 'Court'), None)
+            if court:
+                match_info['court'] = court['value']
+
+            # Get duration
+            duration = next((info for info in additional_info if info['name'] == 'Match Duration'), None)
+            if duration:
+                match_info['duration'] = duration['value']
+
+    # Get stats
+    if fields['service'] is not None:
+        stats_dictionary = {
+            'Aces': 'aces',
+            'Double Faults': 'dfs',
+            '1st Serve Points Won': ['serve1_w', 'serve1', 'ret1_w', 'ret1'],
+            '2nd Serve Points Won': ['serve2_w', 'serve2', 'ret2_w', 'ret2'],
+            'Break Points Saved': ['bps_saved', 'bps_faced', 'bps_converted', 'bp_opps'],
+            'Service Games Played': ['serve_games', 'return_games']
+        }
+
+        for columns in fields['service']:
+            label = columns[1]
+
+            if stats_dictionary.get(label) is not None:
+                p1_stat = columns[0]
+                p2_stat = columns[2]
+
+                if label in ('Aces', 'Double Faults'):
+                    key = stats_dictionary[label]
+                    match_info['p1'][key] = int(p1_stat)
+                    match_info['p2'][key] = int(p2_stat)
+                elif label == 'Service Games Played':
+                    key1, key2 = stats_dictionary[label]
+                    match_info['p1'][key1] = int(p1_stat)
+                    match_info['p2'][key1] = int(p2_stat)
+                    match_info['p1'][key2] = int(p2_stat)
+                    match_info['p2'][key2] = int(p1_stat)
+                else:
+                    key1, key2, key3, key4 = stats_dictionary[label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key3] = int(p1_stripped.group(2)) - int(p1_stripped.group(1))
+                    match_info['p2'][key4] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                    match_info['p1'][key3] = int(p2_stripped.group(2)) - int(p2_stripped.group(1))
+                    match_info['p1'][key4] = int(p2_stripped.group(2))
+
+    return match_info
+
+# The player page needs clicks between the Singles and Doubles tabs, so the captured sections are stored as one document
+def atp_player_page(title, singles, doubles, details):
+    return f'<title>{escape(title)}</title><div data-tab="singles">{singles}</div><div data-tab="doubles">{doubles}</div><div data-tab="details">{details}</div>'
+
+def parse_atp_player(html, context):
+    page = make_soup(html)
+
+    # Get player name and current URL
+    title = page.title.get_text()
+    player_name = title.split('|')[0].strip()
+    atp_link = context['url'].replace('/x/', f"/{player_name.lower().replace(' ', '-')}/")
+
+    # Initialise dictionary to hold player data
+    params = {
+        "id": context['player_id'],
+        "atp_link": atp_link,
+        'current_singles': None,
+        'ch_singles': None,
+        'ch_singles_date': None,
+        'current_doubles': None,
+        'ch_doubles': None,
+        'ch_doubles_date': None
+    }
+
+    # Get player stats
+    # Singles stats
+    singlesHeaderSoup = page.find(attrs={'data-tab': 'singles'})
+    singles_year_stats, singles_career_stats = singlesHeaderSoup.find_all('div', class_='player-stats-details')
+    singles_current_rank_container = singles_year_stats.find('div', class_='stat')
+    if singles_current_rank_container:
+        params["current_singles"] = int(singles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
+    pm_container = singles_career_stats.find('div', class_='prize_money').get_text()
+    pm_text = re.search(r"\$([\d,]+)", pm_container).group(1)
+    params['pm'] = int(pm_text.replace(",", ""))
+    singles_ch_container = singles_career_stats.find('div', class_='stat')
+    if singles_ch_container:
+        singles_ch_label = singles_ch_container.get_text(strip=True)
+        singles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", singles_ch_label)
+        params['ch_singles'] = int(singles_ch_text.group(1)) if singles_ch_text else None
+        params['ch_singles_date'] = singles_ch_text.group(2).replace('.', '-') if singles_ch_text else None
+
+    # Doubles stats
+    doublesHeaderSoup = page.find(attrs={'data-tab': 'doubles'})
+    doubles_year_stats, doubles_career_stats = doublesHeaderSoup.find_all('div', class_='player-stats-details')
+    doubles_current_rank_container = doubles_year_stats.find('div', class_='stat')
+    if doubles_current_rank_container:
+        params["current_doubles"] = int(doubles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
+    doubles_ch_container = doubles_career_stats.find('div', class_='stat')
+    if doubles_ch_container:
+        doubles_ch_label = doubles_ch_container.get_text(strip=True)
+        doubles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", doubles_ch_label)
+        params['ch_doubles'] = int(doubles_ch_text.group(1)) if doubles_ch_text else None
+        params['ch_doubles_date'] = doubles_ch_text.group(2).replace('.', '-') if doubles_ch_text else None
+
+    # Get player details
+    detailsSoup = page.find(attrs={'data-tab': 'details'})
+    pd_items = detailsSoup.find_all('li')
+    for item in pd_items:
+        text = item.get_text(strip=True)
+        if text.startswith("Country"):
+            params['country'] = text.removeprefix('Country')
+        elif text.startswith('Turned pro'):
+            pro_search = re.search(r"(\d{4})", text)
+            params['year'] = pro_search.group(1) if pro_search else None
+        elif text.startswith('Height'):
+            height_text = re.search(r"(\d+)cm", text)
+            params['height'] = int(height_text.group(1)) if height_text else None
+        elif text.startswith("DOB") or text.startswith("Age"):
+            params['dob'] = re.search(r"(\d{4}\/\d{2}\/\d{2})", text).group(1).replace('/', '-')
+        elif text.startswith("Coach"):
+            coach_text = text.removeprefix('Coach')
+            if 'None' in coach_text or coach_text == "":
+                params['coach'] = None
+            elif ',' in coach_text or 'and' in coach_text.lower() or ' & ' in coach_text.lower() or ' / ' in coach_text or '/' in coach_text:
+                coaches = re.split(r',| and | & | / |/', coach_text)
+                params['coach'] = [coach.strip() for coach in coaches if coach.strip()]
+            else:
+                params['coach'] = [coach_text]
+        elif text.startswith("Plays"):
+            params['rh'] = 'Right' if "Right" in text else 'Left' if "Left" in text else None
+            params['bh'] = 'Two' if "Two" in text else 'One' if "One" in text else None
+
+    return params
+
+def parse_atp_activity(html, context):
+    player_activity = {
+        'entry_id': context['entry_id'],
+        'player_id': context['player_id']
+    }
+
+    soup = make_soup(html)
+
+    tournament_rows = soup.find_all('div', class_='tournament')
+
+    if len(tournament_rows) == 1:
+        row = tournament_rows[0]
+    elif len(tournament_rows) > 1:
+        target_row = None
+        for row in tournament_rows:
+            a_tag = row.find('a', href=True)
+            if a_tag and f"/{context['tournament_id']}/overview" in a_tag['href']:
+                target_row = row
+                break
+
+        if not target_row:
+            print(f"No activity found for {context['player_id']}")
+            return None
+
+        row = target_row
+    else:
+        print(f"No activity found for {context['player_id']}")
+        return None
+
+    footer = row.next_sibling
+
+    if not footer or footer == "":
+        print(f"No activity found for {context['player_id']}")
+        return None
+
+    footer_text = footer.get_text(strip=True).split(', ')
+    for text in footer_text:
+        label, value = text.split(':')
+        if label == 'Points':
+            player_activity['points'] = int(value.strip())
+        elif label == 'ATP Ranking':
+            player_activity['rank'] = int(value.strip())
+        elif label == 'Prize Money':
+            for prefix in [' $', ' €', ' £', ' A$']:
+                if value.startswith(prefix):
+                    value = value.removeprefix(prefix)
+                    break
+            player_activity['pm'] = int(value.strip().replace(',', ''))
+
+    return player_activity
+
+def parse_wta_player(html, context):
+    player = { 'id': context['player_id'] }
+
+    page = make_soup(html)
+
+    header = page.find(class_='page-hero')
+    main = page.find(class_='page-content')
+
+    stats_block = header.select_one('section')
+    script_block = header.find('script', type='application/ld+json')
+    name_tag = header.select_one('h1.profile-header__name')
+    country = ""
+    bio_block = main.find_all('div', class_ = 'profile-bio__info-block')
+
+    if stats_block:
+        stats_details = stats_block.get('data-player-stats')
+        if stats_details:
+            parsed = json.loads(stats_details)
+            career_stats = parsed['career']
+            ytd_stats = parsed['ytd']
+
+            singlesHighRank = career_stats['singles']['highRankDate']
+            singlesDate = datetime.strptime(singlesHighRank, "%d %b %y") if singlesHighRank else None
+            player['singles_ch_date'] = singlesDate.strftime("%Y-%m-%d")
+            doublesHighRank = career_stats['doubles']['highRankDate']
+            doublesDate = datetime.strptime(doublesHighRank, "%d %b %y") if doublesHighRank else None
+            player['doubles_ch_date'] = doublesDate.strftime("%Y-%m-%d")
+            player['ch_singles'] = None if career_stats['singles']['rank'] == '-' else int(career_stats['singles']['rank'])
+            player['ch_doubles'] = None if career_stats['doubles']['rank'] == '-' else int(career_stats['doubles']['rank'])
+            player['pm'] = 0 if career_stats['prizeMoney'] == '-' else int(career_stats['prizeMoney'])
+
+            player['current_singles'] = None if ytd_stats['singles']['rank'] == '-' else int(ytd_stats['singles']['rank'])
+            player['current_doubles'] = None if ytd_stats['doubles']['rank'] == '-' else int(ytd_stats['doubles']['rank'])
+
+    else:
+        print("No stats block found")
+
+    if script_block:
+        country_mapping = {
+            'Czech Republic': 'Czechia',
+            'The Netherlands': 'Netherlands',
+            'Republic of Egypt': 'Egypt',
+            'Korea (South)': 'South Korea',
+            'Macedonia': 'North Macedonia',
+            'Hong-Kong, China': 'Hong Kong'
+        }
+        try:
+            data = json.loads(script_block.string)
+            country_text = data.get('nationality').get('name')
+            print(country_text)
+            country = country_mapping[country_text] if country_text in country_mapping else country_text
+            player['dob'] = data.get('birthDate')
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON: {e}")
+    else:
+        print("No script block found")
+
+    if name_tag:
+        parts = list(name_tag.stripped_strings)
+        player['first_name'], player['last_name'] = parts
+    else:
+        print("No name tag found")
+
+    if bio_block:
+        plays_detail = bio_block[0].find('span', class_ = 'profile-bio__info-content')
+        if plays_detail:
+            plays = plays_detail.get_text(strip=True)
+            player['rh'] = 'Right' if plays == 'Right-Handed' else 'Left' if plays == 'Left-Handed' else None
+
+        height_detail = bio_block[2].find('span', class_ = 'profile-bio__info-content')
+        if height_detail:
+            height_m_string = re.search(r'(\d+(?:\.\d+)?\s*m)', height_detail.get_text(strip=True))
+            if height_m_string:
+                m_str = height_m_string.group(1)
+                meters = float(m_str.rstrip('m'))
+                player['height'] = int(meters * 100)
+
+    return {'player': player, 'country': country}
+
+# Parser for each stored page type
+PARSERS = {
+    'atp_draw': parse_atp_draw,
+    'wta_draw': parse_wta_draw,
+    'atp_results': parse_atp_results,
+    'atp_stats': parse_atp_stats,
+    'atp_old_stats': parse_old_atp_stats,
+    'wta_stats': parse_wta_stats,
+    'atp_player': parse_atp_player,
+    'atp_activity': parse_atp_activity,
+    'wta_player': parse_wta_player
+}
@@ -1,19 +1,21 @@
 import os
-import re
-import time
-import json
 from server import app
 from flask import jsonify, request
-from selenium import webdriver
+from browser import driver_pool, has_consent
+from fetch import get_page, ATP_BASE_URL, WTA_BASE_URL
+from parsers import atp_player_page, parse_atp_player, parse_atp_activity, parse_wta_player
+from throttle import scheduler
+import jobs
+from checkpoint import Journal
+import page_cache
+import metrics
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from supabase import create_client
 from pathlib import Path
-from datetime import datetime
 
 # Loading supabase authentication details
 env_path = Path(__file__).resolve().parent / ".env"
@@ -30,108 +32,49 @@ print("SUPABASE_KEY exists:", bool(SUPABASE_KEY))
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Function to handle cookies
+# Function to handle cookies, skipped once the browser profile has recorded consent
 def handle_cookies(driver):
+    if has_consent(driver):
+        metrics.increment('consent.skipped')
+        return True
+
     wait = WebDriverWait(driver, timeout=20)
     try:
         banner = wait.until(EC.visibility_of_element_located((By.ID, 'onetrust-banner-sdk')))
         if banner.is_displayed():
             driver.find_element(By.XPATH, '//*[@id="onetrust-reject-all-handler"]').click()
+            metrics.increment('consent.recorded')
     except TimeoutException:
         return False
 
 # Endpoint to scrape ATP player data
 @app.route("/atp/player/<player_id>", methods=['GET'])
 def get_atp_player(player_id):
-    url = f"https://www.atptour.com/en/players/x/{player_id}/overview"
-    driver = webdriver.Chrome()
-    driver.get(url)
-
-    handle_cookies(driver)
-
-    WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'container')))
-
-    # Get player name and current URL
-    title = driver.title
-    player_name = title.split('|')[0].strip()
-    atp_link = url.replace('/x/', f"/{player_name.lower().replace(' ', '-')}/")
-
-    # Initialise dictionary to hold player data
-    params = {
-        "id": player_id,
-        "atp_link": atp_link,
-        'current_singles': None,
-        'ch_singles': None,
-        'ch_singles_date': None,
-        'current_doubles': None,
-        'ch_doubles': None,
-        'ch_doubles_date': None
-    }
-
-    # Get player stats
-    # Singles stats
-    driver.find_element(By.LINK_TEXT, 'Singles').click()
-    singlesHeader = driver.find_element(By.CLASS_NAME, 'player_profile').get_attribute('innerHTML')
-    singlesHeaderSoup = BeautifulSoup(singlesHeader, 'html.parser')
-    singles_year_stats, singles_career_stats = singlesHeaderSoup.find_all('div', class_='player-stats-details')
-    singles_current_rank_container = singles_year_stats.find('div', class_='stat')
-    if singles_current_rank_container:
-        params["current_singles"] = int(singles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
-    pm_container = singles_career_stats.find('div', class_='prize_money').get_text()
-    pm_text = re.search(r"\$([\d,]+)", pm_container).group(1)
-    params['pm'] = int(pm_text.replace(",", ""))
-    singles_ch_container = singles_career_stats.find('div', class_='stat')
-    if singles_ch_container:
-        singles_ch_label = singles_ch_container.get_text(strip=True)
-        singles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", singles_ch_label)
-        params['ch_singles'] = int(singles_ch_text.group(1)) if singles_ch_text else None
-        params['ch_singles_date'] = singles_ch_text.group(2).replace('.', '-') if singles_ch_text else None
-
-    # Doubles stats
-    driver.find_element(By.LINK_TEXT, 'Doubles').click()
-    doublesHeader = driver.find_element(By.CLASS_NAME, 'player_profile').get_attribute('innerHTML')
-    doublesHeaderSoup = BeautifulSoup(doublesHeader, 'html.parser')
-    doubles_year_stats, doubles_career_stats = doublesHeaderSoup.find_all('div', class_='player-stats-details')
-    doubles_current_rank_container = doubles_year_stats.find('div', class_='stat')
-    if doubles_current_rank_container:
-        params["current_doubles"] = int(doubles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
-    doubles_ch_container = doubles_career_stats.find('div', class_='stat')
-    if doubles_ch_container:
-        doubles_ch_label = doubles_ch_container.get_text(strip=True)
-        doubles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", doubles_ch_label)
-        params['ch_doubles'] = int(doubles_ch_text.group(1)) if doubles_ch_text else None
-        params['ch_doubles_date'] = doubles_ch_text.group(2).replace('.', '-') if doubles_ch_text else None
-
-    # Get player details
-    details = driver.find_element(By.CLASS_NAME, 'pd_content').get_attribute('innerHTML')
-    detailsSoup = BeautifulSoup(details, 'html.parser')
-    pd_items = detailsSoup.find_all('li')
-    for item in pd_items:
-        text = item.get_text(strip=True)
-        if text.startswith("Country"):
-            params['country'] = text.removeprefix('Country')
-        elif text.startswith('Turned pro'):
-            pro_search = re.search(r"(\d{4})", text)
-            params['year'] = pro_search.group(1) if pro_search else None
-        elif text.startswith('Height'):
-            height_text = re.search(r"(\d+)cm", text)
-            params['height'] = int(height_text.group(1)) if height_text else None
-        elif text.startswith("DOB") or text.startswith("Age"):
-            params['dob'] = re.search(r"(\d{4}\/\d{2}\/\d{2})", text).group(1).replace('/', '-')
-        elif text.startswith("Coach"):
-            coach_text = text.removeprefix('Coach')
-            if 'None' in coach_text or coach_text == "":
-                params['coach'] = None
-            elif ',' in coach_text or 'and' in coach_text.lower() or ' & ' in coach_text.lower() or ' / ' in coach_text or '/' in coach_text:
-                coaches = re.split(r',| and | & | / |/', coach_text)
-                params['coach'] = [coach.strip() for coach in coaches if coach.strip()]
-            else:
-                params['coach'] = [coach_text]
-        elif text.startswith("Plays"):
-            params['rh'] = 'Right' if "Right" in text else 'Left' if "Left" in text else None
-            params['bh'] = 'Two' if "Two" in text else 'One' if "One" in text else None
-
-    driver.quit()
+    url = f"{ATP_BASE_URL}/en/players/x/{player_id}/overview"
+    context = {'player_id': player_id, 'url': url}
+
+    html = page_cache.get(url, 'atp_player')
+    if html is None:
+        with scheduler.slot(url) as request, driver_pool.lease('atptour') as driver:
+            with request.timing():
+                driver.get(url)
+
+            handle_cookies(driver)
+
+            WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'container')))
+
+            # Capture each tab of the player header along with the details panel
+            title = driver.title
+            driver.find_element(By.LINK_TEXT, 'Singles').click()
+            singles = driver.find_element(By.CLASS_NAME, 'player_profile').get_attribute('outerHTML')
+            driver.find_element(By.LINK_TEXT, 'Doubles').click()
+            doubles = driver.find_element(By.CLASS_NAME, 'player_profile').get_attribute('outerHTML')
+            details = driver.find_element(By.CLASS_NAME, 'pd_content').get_attribute('outerHTML')
+
+        html = atp_player_page(title, singles, doubles, details)
+        page_cache.put(url, 'atp_player', html, context)
+
+    params = parse_atp_player(html, context)
 
     try:
         response = (supabase.table("players")
@@ -186,177 +129,61 @@ def get_atp_player(player_id):
 
 @app.route("/atp/activity", methods=['POST'])
 def get_atp_activity():
-    data = request.json
+    return jobs.respond('atp_activity', scrape_atp_activity, request.json)
+
+def scrape_atp_activity(data, job):
     tournament_id = data.get('tournament_id')
     year = data.get('year')
     match_type = data.get('match_type')
     category = data.get('category')
     players = data.get('players')
-    activity = []
 
-    driver = webdriver.Chrome()
+    # Updates that fail are handed back to the journal, so those players are scraped again on resume
+    def add_activity(activity):
+        unwritten = []
+        for item in activity:
+            if item is None:
+                continue
 
-    for player in players:
-        driver.get(f"https://www.atptour.com/en/players/x/{player['player_id']}/player-activity?matchType={match_type}&year={year}&tournament={tournament_id}_{category}")
+            try:
+                supabase.table("entries").update({
+                    'points': item['points'],
+                    'pm': item['pm']
+                }).eq("id", item['entry_id']).execute()
 
-        player_activity = {
-            'entry_id': player['entry_id'],
-            'player_id': player['player_id']
-        }
+                supabase.table("player_entry_mapping").update({
+                    'rank': item['rank']
+                }).eq("entry_id", item['entry_id']).eq("player_id", item['player_id']).execute()
+            except Exception as e:
+                print(item['player_id'], e)
+                unwritten.append(item)
 
-        WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'atp_player-activity')))
-        time.sleep(2)
+        return unwritten
 
-        layout = driver.find_element(By.CLASS_NAME, 'atp_player-activity').get_attribute('innerHTML')
-        soup = BeautifulSoup(layout, 'html.parser')
+    # Players already journaled by an earlier attempt of the same request are skipped
+    journal = Journal('atp_activity', data, add_activity)
+    pending = journal.pending(players)
 
-        tournament_rows = soup.find_all('div', class_='tournament')
+    job.set_total(len(pending))
+    for index, player in enumerate(pending):
+        context = {'entry_id': player['entry_id'], 'player_id': player['player_id'], 'tournament_id': tournament_id, 'year': year, 'match_type': match_type}
+        html = get_page(f"{ATP_BASE_URL}/en/players/x/{player['player_id']}/player-activity?matchType={match_type}&year={year}&tournament={tournament_id}_{category}", 'atp_activity', context)
 
-        if len(tournament_rows) == 1:
-            row = tournament_rows[0]
-        elif len(tournament_rows) > 1:
-            target_row = None
-            for row in tournament_rows:
-                a_tag = row.find('a', href=True)
-                if a_tag and f"/{tournament_id}/overview" in a_tag['href']:
-                    target_row = row
-                    break
+        player_activity = parse_atp_activity(html, context)
+        journal.add(player, player_activity)
+        job.on_result(index, player['player_id'], player_activity, None)
 
-            if not target_row:
-                print(f"No activity found for {player}")
-                continue
+    journal.finish(complete=True)
 
-            row = target_row
-        else:
-            print(f"No activity found for {player}")
-            continue
-
-        footer = row.next_sibling
-
-        if not footer or footer == "":
-            print(f"No activity found for {player}")
-            continue
-
-        footer_text = footer.get_text(strip=True).split(', ')
-        for text in footer_text:
-            label, value = text.split(':')
-            if label == 'Points':
-                player_activity['points'] = int(value.strip())
-            elif label == 'ATP Ranking':
-                player_activity['rank'] = int(value.strip())
-            elif label == 'Prize Money':
-                for prefix in [' $', ' €', ' £', ' A$']:
-                    if value.startswith(prefix):
-                        value = value.removeprefix(prefix)
-                        break
-                player_activity['pm'] = int(value.strip().replace(',', ''))
-
-        activity.append(player_activity)
-
-    driver.quit()
-
-    for item in activity:
-        try:
-            supabase.table("entries").update({
-                'points': item['points'],
-                'pm': item['pm']
-            }).eq("id", item['entry_id']).execute()
-
-            supabase.table("player_entry_mapping").update({
-                'rank': item['rank']
-            }).eq("entry_id", item['entry_id']).eq("player_id", item['player_id']).execute()
-        except Exception as e:
-            print(item['player_id'], e)
-            continue
-
-    return jsonify({"success": True})
+    return {"success": True, "resume_token": journal.token}
 
 @app.route("/wta/player/<player_id>", methods=['GET'])
 def get_wta_player(player_id):
-    player = { 'id': player_id }
-
-    driver = webdriver.Chrome()
-    driver.get(f"https://www.wtatennis.com/players/{player['id']}/x")
-    time.sleep(3)
-
-    WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'page-grid-wrapper')))
-
-    header_html = driver.find_element(By.CLASS_NAME, 'page-hero').get_attribute('innerHTML')
-    main_html = driver.find_element(By.CLASS_NAME, 'page-content').get_attribute('innerHTML')
-
-    driver.quit()
-
-    header = BeautifulSoup(header_html, 'html.parser')
-    main = BeautifulSoup(main_html, 'html.parser')
-
-    stats_block = header.select_one('section')
-    script_block = header.find('script', type='application/ld+json')
-    name_tag = header.select_one('h1.profile-header__name')
-    country = ""
-    bio_block = main.find_all('div', class_ = 'profile-bio__info-block')
-
-    if stats_block:
-        stats_details = stats_block.get('data-player-stats')
-        if stats_details:
-            parsed = json.loads(stats_details)
-            career_stats = parsed['career']
-            ytd_stats = parsed['ytd']
-
-            singlesHighRank = career_stats['singles']['highRankDate']
-            singlesDate = datetime.strptime(singlesHighRank, "%d %b %y") if singlesHighRank else None
-            player['singles_ch_date'] = singlesDate.strftime("%Y-%m-%d")
-            doublesHighRank = career_stats['doubles']['highRankDate']
-            doublesDate = datetime.strptime(doublesHighRank, "%d %b %y") if doublesHighRank else None
-            player['doubles_ch_date'] = doublesDate.strftime("%Y-%m-%d")
-            player['ch_singles'] = None if career_stats['singles']['rank'] == '-' else int(career_stats['singles']['rank'])
-            player['ch_doubles'] = None if career_stats['doubles']['rank'] == '-' else int(career_stats['doubles']['rank'])
-            player['pm'] = 0 if career_stats['prizeMoney'] == '-' else int(career_stats['prizeMoney'])
-
-            player['current_singles'] = None if ytd_stats['singles']['rank'] == '-' else int(ytd_stats['singles']['rank'])
-            player['current_doubles'] = None if ytd_stats['doubles']['rank'] == '-' else int(ytd_stats['doubles']['rank'])
-
-    else:
-        print("No stats block found")
-
-    if script_block:
-        country_mapping = {
-            'Czech Republic': 'Czechia',
-            'The Netherlands': 'Netherlands',
-            'Republic of Egypt': 'Egypt',
-            'Korea (South)': 'South Korea',
-            'Macedonia': 'North Macedonia',
-            'Hong-Kong, China': 'Hong Kong'
-        }
-        try:
-            data = json.loads(script_block.string)
-            country_text = data.get('nationality').get('name')
-            print(country_text)
-            country = country_mapping[country_text] if country_text in country_mapping else country_text
-            player['dob'] = data.get('birthDate')
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {e}")
-    else:
-        print("No script block found")
-
-    if name_tag:
-        parts = list(name_tag.stripped_strings)
-        player['first_name'], player['last_name'] = parts
-    else:
-        print("No name tag found")
-
-    if bio_block:
-        plays_detail = bio_block[0].find('span', class_ = 'profile-bio__info-content')
-        if plays_detail:
-            plays = plays_detail.get_text(strip=True)
-            player['rh'] = 'Right' if plays == 'Right-Handed' else 'Left' if plays == 'Left-Handed' else None
-
-        height_detail = bio_block[2].find('span', class_ = 'profile-bio__info-content')
-        if height_detail:
-            height_m_string = re.search(r'(\d+(?:\.\d+)?\s*m)', height_detail.get_text(strip=True))
-            if height_m_string:
-                m_str = height_m_string.group(1)
-                meters = float(m_str.rstrip('m'))
-                player['height'] = int(meters * 100)
+    context = {'player_id': player_id}
+    html = get_page(f"{WTA_BASE_URL}/players/{player_id}/x", 'wta_player', context)
+    record = parse_wta_player(html, context)
+    player = record['player']
+    country = record['country']
 
     try:
         response = (supabase.table("players").update({
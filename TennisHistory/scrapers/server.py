@@ -1,5 +1,11 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
+import metrics
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": ["http://localhost:3000","http://127.0.0.1:3000", "http://localhost:3001","http://127.0.0.1:3001"]}})
\ No newline at end of file
+CORS(app, resources={r"/*": {"origins": ["http://localhost:3000","http://127.0.0.1:3000", "http://localhost:3001","http://127.0.0.1:3001"]}})
+
+# Endpoint to inspect scraper metrics (wait times, pool usage)
+@app.route("/metrics", methods=['GET'])
+def get_metrics():
+    return jsonify(metrics.snapshot())
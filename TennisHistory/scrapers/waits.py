@@ -0,0 +1,106 @@
+import os
+import time
+from selenium.common.exceptions import TimeoutException
+import metrics
+
+# How often readiness is polled and how long the network must stay quiet to count as idle
+POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", "0.25"))
+IDLE_WINDOW = float(os.getenv("WAIT_IDLE_WINDOW", "1.0"))
+
+# Readiness rules per page type
+#   ready:   selectors the parser needs - the page is ready once all of them exist
+#   base:    selectors that must exist before an idle network also counts as ready
+#   idle:    whether a quiet network is enough (for pages that may legitimately lack the data)
+#   timeout: seconds before giving up, overridable with WAIT_TIMEOUT_<PAGE_TYPE>
+PAGE_TYPES = {
+    'atp_stats': {
+        'ready': ['.RGMatchStats', '#Stat-header .team2 .name a', '.desktopView .labelWrappper'],
+        'timeout': 20
+    },
+    'atp_old_stats': {
+        'ready': ['.atp_match-stats .opponent-team a', '.atp_match-stats .stas-internal--match li .stats-item-legend'],
+        'timeout': 20
+    },
+    'wta_stats': {
+        'ready': ['#match-stats .js-match-stats .compare-stats-block__row'],
+        'base': ['#match-stats .js-match-stats'],
+        'idle': True,
+        'timeout': 20
+    },
+    'atp_activity': {
+        'ready': ['.atp_player-activity .tournament'],
+        'base': ['.atp_player-activity'],
+        'idle': True,
+        'timeout': 15
+    },
+    'atp_draw': {
+        'ready': ['.atp-draw-container .draw .draw-header'],
+        'timeout': 10
+    },
+    'wta_draw': {
+        'ready': ['.tournament-draw__round-container-scrollbar'],
+        'timeout': 10
+    },
+    'atp_results': {
+        'ready': ['.atp_accordion-items .atp_accordion-item'],
+        'base': ['.atp_accordion-items'],
+        'idle': True,
+        'timeout': 15
+    },
+    'wta_player': {
+        'ready': ['.page-hero section[data-player-stats]', '.page-content .profile-bio__info-block'],
+        'base': ['.page-grid-wrapper'],
+        'idle': True,
+        'timeout': 15
+    }
+}
+
+READY_SCRIPT = """
+    const [ready, base] = arguments;
+    const present = (selectors) => selectors.every((selector) => document.querySelector(selector) !== null);
+    return {
+        ready: present(ready),
+        base: present(base),
+        complete: document.readyState === 'complete',
+        resources: performance.getEntriesByType('resource').length
+    };
+"""
+
+def page_timeout(page_type):
+    override = os.getenv(f"WAIT_TIMEOUT_{page_type.upper()}")
+    return float(override) if override else PAGE_TYPES[page_type]['timeout']
+
+# Block until the page has what its parser needs, recording how long that took
+def wait_for_page(driver, page_type):
+    config = PAGE_TYPES[page_type]
+    timeout = page_timeout(page_type)
+    started = time.monotonic()
+    resources = None
+    quiet_since = None
+
+    while True:
+        state = driver.execute_script(READY_SCRIPT, config['ready'], config.get('base', []))
+        now = time.monotonic()
+
+        if state['ready']:
+            outcome = 'ready'
+            break
+
+        if config.get('idle') and state['base'] and state['complete']:
+            if state['resources'] != resources:
+                resources = state['resources']
+                quiet_since = now
+            elif now - quiet_since >= IDLE_WINDOW:
+                outcome = 'idle'
+                break
+
+        if now - started >= timeout:
+            metrics.increment(f"wait.{page_type}.timeout")
+            metrics.record_timing(f"wait.{page_type}", now - started)
+            raise TimeoutException(f"{page_type} page not ready after {timeout}s")
+
+        time.sleep(POLL_INTERVAL)
+
+    metrics.increment(f"wait.{page_type}.{outcome}")
+    metrics.record_timing(f"wait.{page_type}", now - started)
+    return outcome
@@ -0,0 +1,450 @@
+from bracket import Bracket
+from parse_backend import make_soup, subtree, subtrees, release
+from datetime import datetime
+from html import escape
+import re
+import json
+
+# Parsers turn a stored page into the records its endpoint writes. They only need the HTML and the
+# request context saved with it, so pages can be re-parsed offline without a browser (see replay.py)
+
+# The player page needs clicks between the Singles and Doubles tabs, so the captured sections are stored as one document
+def atp_player_page(title, singles, doubles, details):
+    return f'<title>{escape(title)}</title><div data-tab="singles">{singles}</div><div data-tab="doubles">{doubles}</div><div data-tab="details">{details}</div>'
+
+def parse_atp_player(html, context):
+    page = make_soup(html)
+
+    # Get player name and current URL
+    title = page.title.get_text()
+    player_name = title.split('|')[0].strip()
+    atp_link = context['url'].replace('/x/', f"/{player_name.lower().replace(' ', '-')}/")
+
+    # Initialise dictionary to hold player data
+    params = {
+        "id": context['player_id'],
+        "atp_link": atp_link,
+        'current_singles': None,
+        'ch_singles': None,
+        'singles_date': None,
+        'current_doubles': None,
+        'ch_doubles': None,
+        'doubles_date': None
+    }
+
+    # Get player stats
+    # Singles stats
+    singlesHeaderSoup = page.find(attrs={'data-tab': 'singles'})
+    singles_year_stats, singles_career_stats = singlesHeaderSoup.find_all('div', class_='player-stats-details')
+    singles_current_rank_container = singles_year_stats.find('div', class_='stat')
+    if singles_current_rank_container:
+        params["current_singles"] = int(singles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
+    pm_container = singles_career_stats.find('div', class_='prize_money').get_text()
+    pm_text = re.search(r"\$([\d,]+)", pm_container).group(1)
+    params['pm'] = int(pm_text.replace(",", ""))
+    singles_ch_container = singles_career_stats.find('div', class_='stat')
+    if singles_ch_container:
+        singles_ch_label = singles_ch_container.get_text(strip=True)
+        singles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", singles_ch_label)
+        params['ch_singles'] = int(singles_ch_text.group(1)) if singles_ch_text else None
+        params['singles_date'] = singles_ch_text.group(2).replace('.', '-') if singles_ch_text else None
+
+    # Doubles stats
+    doublesHeaderSoup = page.find(attrs={'data-tab': 'doubles'})
+    doubles_year_stats, doubles_career_stats = doublesHeaderSoup.find_all('div', class_='player-stats-details')
+    doubles_current_rank_container = doubles_year_stats.find('div', class_='stat')
+    if doubles_current_rank_container:
+        params["current_doubles"] = int(doubles_current_rank_container.get_text(strip=True).removesuffix("Rank"))
+    doubles_ch_container = doubles_career_stats.find('div', class_='stat')
+    if doubles_ch_container:
+        doubles_ch_label = doubles_ch_container.get_text(strip=True)
+        doubles_ch_text = re.search(r"(\d+)Career High Rank \((\d{4}\.\d{2}\.\d{2})\)", doubles_ch_label)
+        params['ch_doubles'] = int(doubles_ch_text.group(1)) if doubles_ch_text else None
+        params['doubles_date'] = doubles_ch_text.group(2).replace('.', '-') if doubles_ch_text else None
+
+    # Get player details
+    detailsSoup = page.find(attrs={'data-tab': 'details'})
+    pd_items = detailsSoup.find_all('li')
+    for item in pd_items:
+        text = item.get_text(strip=True)
+        if text.startswith("Country"):
+            params['country'] = text.removeprefix('Country')
+        elif text.startswith('Turned pro'):
+            pro_search = re.search(r"(\d{4})", text)
+            params['year'] = pro_search.group(1) if pro_search else None
+        elif text.startswith('Height'):
+            height_text = re.search(r"(\d+)cm", text)
+            params['height'] = int(height_text.group(1)) if height_text else None
+        elif text.startswith("DOB") or text.startswith("Age"):
+            params['dob'] = re.search(r"(\d{4}\/\d{2}\/\d{2})", text).group(1).replace('/', '-')
+        elif text.startswith("Coach"):
+            coach_text = text.removeprefix('Coach')
+            if 'None' in coach_text or coach_text == "":
+                params['coach'] = None
+            elif ',' in coach_text or 'and' in coach_text.lower() or ' & ' in coach_text.lower() or ' / ' in coach_text or '/' in coach_text:
+                coaches = re.split(r',| and | & | / |/', coach_text)
+                params['coach'] = [coach.strip() for coach in coaches if coach.strip()]
+            else:
+                params['coach'] = [coach_text]
+        elif text.startswith("Plays"):
+            params['rh'] = 'Right' if "Right" in text else 'Left' if "Left" in text else None
+            params['bh'] = 'Two' if "Two" in text else 'One' if "One" in text else None
+
+    return params
+
+# Matches in a main draw round, from its name
+def main_round_matches(round_name):
+    return {'Final': 1, 'Semifinals': 2, 'Quarterfinals': 4}.get(round_name) or int(round_name.removeprefix('Round of ')) // 2
+
+# Bracket index of a round: qualifying rounds are numbered by name, main draw rounds by how many matches they hold
+def atp_round_index(bracket, round_name):
+    if round_name.startswith('Qualifying round'):
+        return int(round_name.removeprefix('Qualifying round ')) - 1
+    return bracket.sizes.index(main_round_matches(round_name))
+
+# Bracket of the draw on the page: a qualifying draw runs to the last round the page shows and, unless the request
+# gives its size, has two lines per first-round match; a main draw is sized by its largest round
+def atp_draw_bracket(rounds, draw_size, event):
+    qualifying = [(name, round) for name, round in rounds if name.startswith('Qualifying round')]
+    if qualifying:
+        round_count = max(int(name.removeprefix('Qualifying round ')) for name, _ in qualifying)
+        if draw_size:
+            return Bracket(draw_size, round_count)
+        first_round = next((round for name, round in qualifying if name == 'Qualifying round 1'), None)
+        if first_round is None:
+            raise ValueError(f"Qualifying draw of {event} has no first round to size it by; give its draw_size")
+        return Bracket(2 * len(first_round.find_all('div', class_='draw-stats')), round_count)
+    return Bracket(2 * max(main_round_matches(name) for name, _ in rounds))
+
+def parse_atp_draw(html, context):
+    tid = context['tid']
+    year = context['year']
+    match_type = context['type']
+    draw = context['draw']
+    draw_size = context.get('draw_size')
+    matches = []
+
+    soup = subtree(html, 'atp-draw-container')
+
+    round_name_mapping = {
+        'Finals': 'Final',
+        "Final": "Final",
+        'Semi-Finals': 'Semifinals',
+        "Semifinals": "Semifinals",
+        'Quarter-Finals': 'Quarterfinals',
+        "Quarterfinals": "Quarterfinals",
+        'Round of 16': 'Round of 16',
+        'Round of 32': 'Round of 32',
+        'Round of 64': 'Round of 64',
+        'Round of 128': 'Round of 128',
+        '3rd Round Qualifying': 'Qualifying round 3',
+        '2nd Round Qualifying': 'Qualifying round 2',
+        '1st Round Qualifying': 'Qualifying round 1'
+    }
+
+    rounds = [
+        (round_name_mapping[round.find('div', class_='draw-header').get_text(strip=True)], round)
+        for round in soup.find_all('div', class_='draw')
+    ]
+    bracket = atp_draw_bracket(rounds, draw_size, f"{tid}{year}")
+
+    for round_name, round in rounds:
+        # Get matches
+        match_no = bracket.match_no(atp_round_index(bracket, round_name), 0)
+        round_matches = round.find_all('div', class_='draw-stats')
+        for match in round_matches:
+            match_info = {
+                'id': f"{tid}{year}-ATP {match_type[0]} {draw[0]} {match_no}",
+                'match_no': match_no,
+                'round': round_name,
+                'p1': {},
+                'p2': {},
+                'p3': {},
+                'p4': {},
+                'bye': False
+            }
+
+            match_no += 1
+
+            players = match.find_all('div', class_ = 'name')
+
+            skip1 = False
+
+            for index, player in enumerate(players):
+                if player.get_text(strip=True) in ('Bye', 'Bye1'):
+                    match_info['bye'] = True
+                    if match_type == 'Doubles' and index == 0 and len(players) < 4:
+                        skip1 = True
+                elif player.get_text(strip=True) in ('Qualifier', 'TBA', 'Alternate'):
+                    if match_type == 'Doubles' and index == 0 and len(players) < 4:
+                        skip1 = True
+                else:
+                    try:
+                        p_link = player.find('a')
+                        id = re.search(r'/([a-zA-Z0-9]{4})/', p_link['href'])
+                        match_info[f"p{index + 1 if not skip1 else index + 2}"]['id'] = id.group(1)
+                        status_tag = player.find('span')
+                        if status_tag:
+                            status_text = status_tag.get_text(strip=True).strip("()")
+                            # Extract seed
+                            seed_text = re.search(r'\d+', status_text)
+                            match_info[f"p{index + 1}"]['seed'] = int(seed_text.group()) if seed_text else None
+                            # Extract status
+                            status_text = re.search(r'[A-Za-z]+', status_text)
+                            match_info[f"p{index + 1}"]['status'] = status_text.group() if status_text else None
+                    except:
+                        pass
+            matches.append(match_info)
+
+        release(round)
+
+    return matches
+
+def parse_atp_results(html, context):
+    matches = []
+    links = []
+
+    # Each day's accordion item is parsed on its own and freed once its matches are read
+    containers = subtrees(html, 'atp_accordion-item', 'div')
+
+    for container in containers:
+        date_container = container.find('h4')
+        date_obj = None
+        if date_container:
+            stripped_date = re.match(r"([A-Za-z]{3}, \d{2} [A-Za-z]+, \d{4})", date_container.get_text(strip=True))
+            date_obj = datetime.strptime(stripped_date.group(1), "%a, %d %B, %Y") if stripped_date else None
+
+        matches_details = container.find_all('div', class_='match')
+
+        for match in matches_details:
+
+            # Get match details
+            header_div = match.find('div', class_='match-header')
+            match_headers = header_div.find_all('span')
+
+            match_header = match_headers[0].get_text(strip=True)
+            parts = [p.strip() for p in match_header.split(' - ', 1)]
+            court_name = parts[1] if len(parts) > 1 else None
+            match_time = match_headers[1].get_text(strip=True) if len(match_headers) > 1 else '00:00:00'
+            hours, minutes, seconds = map(int, match_time.split(':')) if len(match_time.split(':')) == 3 else (int(match_time.split(':')[0]), int(match_time.split(':')[1]), 0)
+
+            match_detail = {
+                'court': court_name,
+                'hours': hours,
+                'minutes': minutes,
+                'seconds': seconds,
+                't1': {},
+                't2': {}
+            }
+
+            if not date_obj is None:
+                match_detail['date'] = date_obj.strftime("%Y-%m-%d")
+
+            # Get umpire
+            umpire_container = match.find('div', class_='match-umpire')
+            if umpire_container:
+                umpire_text = umpire_container.get_text(strip=True).removeprefix('Ump: ')
+                if umpire_text != "":
+                    match_detail['umpire'] = umpire_text
+
+            players_container = match.find_all('div', class_='name')
+
+            for idx, player in enumerate(players_container):
+                link = player.find('a')
+                if link.get_text(strip=True) == 'Bye':
+                    match_detail["bye"] = True
+                else:
+                    id = re.search("/([a-zA-Z0-9]{4})/", link['href'])
+                    # if id is None:
+                    #     if link.get_text(strip=True) == 'Marcus Willis':
+                    #         match_detail[f"p{idx + 1}"] = 'w521'
+                    # else:
+                    match_detail[f"p{idx + 1}"] = id.group(1)
+
+            # Get scores
+            scores_container = match.find_all('div', class_='scores')
+            for idx, score_container in enumerate(scores_container):
+                scores_items = score_container.find_all('div', class_='score-item')
+                setNumber = 0
+                for i, score in enumerate(scores_items):
+                    spans = score.find_all('span')
+                    if (len(spans) > 0):
+                        match_detail[f"t{idx + 1}"][f"s{setNumber + i + 1}"] = int(spans[0].get_text(strip=True))
+                        if len(spans) > 1:
+                            match_detail[f"t{idx + 1}"][f"t{setNumber + i + 1}"] = int(spans[1].get_text(strip=True))
+                    else:
+                        setNumber -= 1
+
+            try:
+                stats_link = match.find('a', string='Stats').get('href')
+                links.append(stats_link)
+            except:
+                pass
+
+            matches.append(match_detail)
+
+        release(container)
+
+    return {'matches': matches, 'links': links}
+
+# Fields the stats parser reads: the JSON stored by the in-browser extractor (extractors.py), or the same fields read from HTML
+def atp_stats_fields(html):
+    if html.lstrip().startswith('{'):
+        return json.loads(html)
+
+    soup = subtree(html, 'atp_layout-container')
+    players_container = soup.find(id="Stat-header")
+
+    def links(team):
+        container = players_container.select_one(team)
+        return [link.get('href', '') for link in container.select('.name a')] if container else []
+
+    def text(stat, class_):
+        tag = stat.find('div', class_=class_)
+        return tag.get_text(strip=True) if tag else None
+
+    return {
+        'team1': links('.team1'),
+        'team2': links('.team2'),
+        'stats': [
+            {
+                'label': text(stat, 'labelWrappper'),
+                'p1': text(stat, 'player1'),
+                'p2': text(stat, 'player2'),
+                'speed1': text(stat, 'speedkmh1'),
+                'speed2': text(stat, 'speedkmh2')
+            }
+            for stat in soup.find_all('div', class_='desktopView')
+        ]
+    }
+
+def parse_atp_stats(html, context):
+    fields = atp_stats_fields(html)
+
+    match_info = {
+        'p1': {},
+        'p2': {}
+    }
+
+    # Get players
+    def extract_team_id(links):
+        return re.search(r'/([a-zA-Z0-9]{4})/', links[0]).group(1)
+
+    team1_id = extract_team_id(fields['team1'])
+    team2_id = extract_team_id(fields['team2'])
+    match_info['p1_id'] = team1_id.lower()
+    match_info['p2_id'] = team2_id.lower()
+
+    # Get stats
+    stats_dictionary = {
+        'Aces': 'aces',
+        'Double Faults': 'dfs',
+        '1st serve points won': ['serve1_w', 'serve1', 'ret1_w', 'ret1'],
+        '2nd serve points won': ['serve2_w', 'serve2', 'ret2_w', 'ret2'],
+        'Break Points Saved': ['bps_saved', 'bps_faced', 'bps_converted', 'bp_opps'],
+        'Net points won': ['net_w', 'net'],
+        'Winners': 'winners',
+        'Unforced Errors': 'ues',
+        'Max Speed': 'max_speed',
+        '1st Serve Average Speed': 'avg1_speed',
+        '2nd Serve Average Speed': 'avg2_speed',
+        'Service Games Played': 'serve_games',
+        'Return Games Played': 'return_games'
+    }
+    for stat in fields['stats']:
+        stat_label = stat['label']
+        if stats_dictionary.get(stat_label) is not None:
+            if stat_label in ('Max Speed', '1st Serve Average Speed', '2nd Serve Average Speed'):
+                key = stats_dictionary[stat_label]
+                p1_stat = stat['speed1']
+                p2_stat = stat['speed2']
+                match_info['p1'][key] = int(re.search(r'\d{2,3}', p1_stat).group()) if re.search(r'\d{2,3}', p1_stat) is not None else None
+                match_info['p2'][key] = int(re.search(r'\d{2,3}', p2_stat).group()) if re.search(r'\d{2,3}', p2_stat) is not None else None
+            else:
+                p1_stat = stat['p1']
+                p2_stat = stat['p2']
+                if stat_label in ('Aces', 'Double Faults', 'Winners', 'Unforced Errors', 'Service Games Played', 'Return Games Played'):
+                    key = stats_dictionary[stat_label]
+                    match_info['p1'][key] = int(p1_stat)
+                    match_info['p2'][key] = int(p2_stat)
+                elif stat_label == 'Net points won':
+                    key1, key2 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                else:
+                    key1, key2, key3, key4 = stats_dictionary[stat_label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key3] = int(p1_stripped.group(2)) - int(p1_stripped.group(1))
+                    match_info['p2'][key4] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                    match_info['p1'][key3] = int(p2_stripped.group(2)) - int(p2_stripped.group(1))
+                    match_info['p1'][key4] = int(p2_stripped.group(2))
+
+    return match_info
+
+def parse_atp_activity(html, context):
+    player_activity = {
+        'player': context['player']
+    }
+
+    soup = make_soup(html)
+
+    tournament_rows = soup.find_all('div', class_='tournament')
+
+    if len(tournament_rows) == 1:
+        row = tournament_rows[0]
+    elif len(tournament_rows) > 1:
+        target_row = None
+        for row in tournament_rows:
+            a_tag = row.find('a', href=True)
+            if a_tag and f"/{context['tid2']}/overview" in a_tag['href']:
+                target_row = row
+                break
+
+        if not target_row:
+            print(f"No activity found for {context['player']}")
+            return None
+
+        row = target_row
+    else:
+        print(f"No activity found for {context['player']}")
+        return None
+
+    footer = row.next_sibling
+
+    if not footer or footer == "":
+        print(f"No activity found for {context['player']}")
+        return None
+
+    footer_text = footer.get_text(strip=True).split(', ')
+    for text in footer_text:
+        label, value = text.split(':')
+        if label == 'Points':
+            player_activity['points'] = int(value.strip())
+        elif label == 'ATP Ranking':
+            player_activity['rank'] = int(value.strip())
+        elif label == 'Prize Money':
+            for prefix in [' $', ' €', ' £', ' A$']:
+                if value.startswith(prefix):
+                    value = value.removeprefix(prefix)
+                    break
+            player_activity['pm'] = int(value.strip().replace(',', ''))
+
+    return player_activity
+
+# Parser for each stored page type
+PARSERS = {
+    'atp_player': parse_atp_player,
+    'atp_draw': parse_atp_draw,
+    'atp_results': parse_atp_results,
+    'atp_stats': parse_atp_stats,
+    'atp_activity': parse_atp_activity
+}
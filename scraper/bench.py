@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tracemalloc
+import page_cache
+import parse_backend
+from replay import PARSERS
+
+# Parser benchmarks over recorded pages - no network, no browser:
+#   python bench.py record --page-type atp_draw --limit 10   copy pages from the page cache into the corpus
+#   python bench.py run                                      time every parser and check its output against the golden records
+#   python bench.py run --update-golden                      accept the current output as the new golden records
+# The corpus holds one <name>.gz per page in page cache format plus <name>.json with the records it must parse to.
+# It covers every page type, and draws of every size, both rendered and (for stats pages) as extracted JSON fields.
+# A run fails when the corpus is empty, when a page's records differ, or when a page has no golden records yet
+
+CORPUS_DIR = os.getenv("BENCH_CORPUS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_corpus"))
+
+def corpus_pages(corpus_dir, page_types=None):
+    pages = []
+    for page_type in sorted(os.listdir(corpus_dir)) if os.path.isdir(corpus_dir) else []:
+        if page_types and page_type not in page_types:
+            continue
+        for name in sorted(os.listdir(os.path.join(corpus_dir, page_type))):
+            if name.endswith('.gz'):
+                pages.append(os.path.join(corpus_dir, page_type, name))
+    return pages
+
+def golden_path(path):
+    return path[:-len('.gz')] + '.json'
+
+# Round-trip through JSON so records compare the way they are stored
+def normalise(records):
+    return json.loads(json.dumps(records))
+
+def record(cache_dir, corpus_dir, page_types, limit):
+    counts = {}
+    for path in sorted(page_cache.entries(cache_dir), key=os.path.getmtime, reverse=True):
+        try:
+            header, body = page_cache.read_entry(path)
+        except (OSError, ValueError):
+            continue
+
+        page_type = header.get('page_type')
+        if page_type not in PARSERS or (page_types and page_type not in page_types):
+            continue
+        if limit and counts.get(page_type, 0) >= limit:
+            continue
+
+        try:
+            records = PARSERS[page_type](body, header.get('context', {}))
+        except Exception as e:
+            print(f"Skipping {header.get('url')}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+
+        target = os.path.join(corpus_dir, page_type, os.path.basename(path))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+        with open(golden_path(target), 'w') as f:
+            json.dump(normalise(records), f, indent=1, sort_keys=True)
+        counts[page_type] = counts.get(page_type, 0) + 1
+
+    for page_type, count in sorted(counts.items()):
+        print(f"Recorded {count} {page_type} pages")
+
+# Time, allocations and peak memory of one parse. Timing runs without tracemalloc, which slows allocation down
+def measure(parser, body, context, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = parser(body, context)
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    parser(body, context)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return records, min(times), allocations, peak
+
+def run(corpus_dir, page_types, repeat, update_golden):
+    results = {}
+    mismatched = []
+    unchecked = []
+
+    pages = corpus_pages(corpus_dir, page_types)
+    if not pages:
+        print(f"No recorded pages in {corpus_dir}{' for ' + ', '.join(page_types) if page_types else ''}", file=sys.stderr)
+        return False
+
+    for path in pages:
+        header, body = page_cache.read_entry(path)
+        page_type = header['page_type']
+        context = header.get('context', {})
+
+        records, seconds, allocations, peak = measure(PARSERS[page_type], body, context, repeat)
+        records = normalise(records)
+
+        # A page without golden records fails like a mismatch, so a new page is only accepted with --update-golden
+        if update_golden:
+            with open(golden_path(path), 'w') as f:
+                json.dump(records, f, indent=1, sort_keys=True)
+        elif not os.path.exists(golden_path(path)):
+            unchecked.append(path)
+        else:
+            with open(golden_path(path)) as f:
+                if json.load(f) != records:
+                    mismatched.append(path)
+
+        # Draw pages are reported per draw size, since their cost grows with it
+        variant = f"{page_type} ({context['draw_size']})" if context.get('draw_size') else page_type
+        totals = results.setdefault(variant, {'pages': 0, 'seconds': 0, 'allocations': 0, 'peak': 0, 'bytes': 0})
+        totals['pages'] += 1
+        totals['seconds'] += seconds
+        totals['allocations'] += allocations
+        totals['peak'] = max(totals['peak'], peak)
+        totals['bytes'] += len(body)
+
+    print(f"Backend: {parse_backend.current()}, best of {repeat}")
+    print(f"{'page type':<28}{'pages':>7}{'ms/page':>10}{'allocs/page':>13}{'peak KB':>10}{'page KB':>10}")
+    for variant, totals in sorted(results.items()):
+        pages = totals['pages']
+        print(f"{variant:<28}{pages:>7}{totals['seconds'] / pages * 1000:>10.2f}{totals['allocations'] // pages:>13}{totals['peak'] // 1024:>10}{totals['bytes'] // pages // 1024:>10}")
+
+    covered = {variant.split(' ')[0] for variant in results}
+    missing = sorted(set(page_types or PARSERS) - covered)
+    if missing:
+        print(f"No recorded pages for: {', '.join(missing)}")
+
+    for path in mismatched:
+        print(f"Output differs from golden records: {path}", file=sys.stderr)
+    for path in unchecked:
+        print(f"No golden records (accept them with --update-golden): {path}", file=sys.stderr)
+    return not mismatched and not unchecked
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parsers over recorded pages")
+    parser.add_argument('--corpus-dir', default=CORPUS_DIR)
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subcommands.add_parser('record', help="Copy pages from the page cache into the corpus")
+    record_parser.add_argument('--cache-dir', default=page_cache.CACHE_DIR)
+    record_parser.add_argument('--page-type', action='append', choices=sorted(PARSERS))
+    record_parser.add_argument('--limit', type=int, default=5, help="Pages to record per page type")
+
+    run_parser = subcommands.add_parser('run', help="Benchmark the parsers and check their output")
+    run_parser.add_argument('--page-type', action='append', choices=sorted(PARSERS))
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--backend', choices=sorted(parse_backend.BUILDERS))
+    run_parser.add_argument('--update-golden', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.cache_dir, args.corpus_dir, args.page_type, args.limit)
+    else:
+        if args.backend:
+            parse_backend.use(args.backend)
+        sys.exit(0 if run(args.corpus_dir, args.page_type, args.repeat, args.update_golden) else 1)
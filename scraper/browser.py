@@ -0,0 +1,276 @@
+import os
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+from urllib.parse import urlsplit
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+import metrics
+
+# Pool configuration
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_LEASE_TIMEOUT = int(os.getenv("DRIVER_LEASE_TIMEOUT", "300"))
+
+# Browser configuration - set DRIVER_HEADLESS=off to watch a scrape
+DRIVER_HEADLESS = os.getenv("DRIVER_HEADLESS", "on") != "off"
+DRIVER_PAGE_LOAD_STRATEGY = os.getenv("DRIVER_PAGE_LOAD_STRATEGY", "eager")
+
+# Persistent user-data profile (consent cookies and HTTP disk cache) kept between runs.
+# Each browser runs on its own copy of it, and the copy is saved back when the browser closes
+DRIVER_PROFILE = os.getenv("DRIVER_PROFILE", "on") != "off"
+DRIVER_PROFILE_DIR = os.getenv("DRIVER_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".browser_profile"))
+DRIVER_DISK_CACHE_MB = int(os.getenv("DRIVER_DISK_CACHE_MB", "256"))
+
+# Chrome's per-instance lock files, which must not be copied between profiles
+PROFILE_LOCKS = shutil.ignore_patterns('Singleton*', 'lockfile', 'LOCK', '*.tmp')
+
+# OneTrust writes this cookie once the banner has been answered
+CONSENT_COOKIE = 'OptanonAlertBoxClosed'
+
+# Requests no parser ever reads: images, fonts, media and trackers
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.m3u8',
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*facebook.net*', '*hotjar.com*', '*scorecardresearch.com*', '*adnxs.com*', '*taboola.com*'
+]
+
+# Per-site profiles, picked by host when a page is rendered
+#   hosts:   hostnames the profile applies to
+#   blocked: URL patterns the browser refuses to load on that site
+SITE_PROFILES = {
+    'atptour': {
+        'hosts': ['atptour.com'],
+        'blocked': BLOCKED_URLS + ['*brightcove*']
+    },
+    'wtatennis': {
+        'hosts': ['wtatennis.com'],
+        'blocked': BLOCKED_URLS + ['*jwplayer*', '*jwpcdn.com*']
+    }
+}
+
+def profile_for(url):
+    host = urlsplit(url).netloc.lower()
+    for name, profile in SITE_PROFILES.items():
+        if any(host == site or host.endswith(f".{site}") for site in profile['hosts']):
+            return name
+    return None
+
+_profile_lock = threading.Lock()
+
+# Copy the saved profile into a fresh directory that only one browser will use
+def clone_profile():
+    clone = tempfile.mkdtemp(prefix='chrome-profile-')
+    with _profile_lock:
+        if os.path.isdir(DRIVER_PROFILE_DIR):
+            shutil.copytree(DRIVER_PROFILE_DIR, clone, ignore=PROFILE_LOCKS, dirs_exist_ok=True)
+    return clone
+
+# Make a closed browser's profile the saved one, swapping directories so readers never see a partial copy
+def save_profile(clone):
+    staging = f"{DRIVER_PROFILE_DIR}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copytree(clone, staging, ignore=PROFILE_LOCKS)
+        with _profile_lock:
+            previous = None
+            if os.path.isdir(DRIVER_PROFILE_DIR):
+                previous = f"{staging}.old"
+                os.rename(DRIVER_PROFILE_DIR, previous)
+            os.rename(staging, DRIVER_PROFILE_DIR)
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
+        metrics.increment('browser_profile.saved')
+    except OSError as e:
+        print(f"Failed to save browser profile: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
+
+def has_consent(driver):
+    return driver.get_cookie(CONSENT_COOKIE) is not None
+
+# The one place Chrome gets launched, so every endpoint runs the same lean browser
+def create_driver():
+    options = webdriver.ChromeOptions()
+    if DRIVER_HEADLESS:
+        options.add_argument('--headless=new')
+    options.page_load_strategy = DRIVER_PAGE_LOAD_STRATEGY
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--mute-audio')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2
+    })
+
+    profile_dir = None
+    if DRIVER_PROFILE:
+        profile_dir = clone_profile()
+        options.add_argument(f'--user-data-dir={profile_dir}')
+        options.add_argument(f'--disk-cache-size={DRIVER_DISK_CACHE_MB * 1024 * 1024}')
+
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    driver.profile_dir = profile_dir
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.site_profile = None
+    return driver
+
+# Switch a browser's request blocking to a site profile, or clear it for a page outside every profile,
+# so a reused browser never keeps the last site's blocklist (a no-op if it already has that profile)
+def apply_profile(driver, name):
+    if getattr(driver, 'site_profile', None) == name:
+        return
+    blocked = SITE_PROFILES[name]['blocked'] if name is not None else []
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+    driver.site_profile = name
+
+# Process-wide pool of warm Chrome instances that endpoints check out and return.
+# Waiters sleep on one condition, notified whenever a browser is returned or a slot frees up
+# (a browser discarded or failing to start), so a waiter can take the browser or spawn a replacement
+class DriverPool:
+    def __init__(self, size, lease_timeout):
+        self.size = size
+        self.lease_timeout = lease_timeout
+        self._idle = []
+        self._available = threading.Condition()
+        self._spawned = 0
+        self._leased = 0
+
+    # Spawn browsers up front so requests don't pay the Chrome cold start
+    def warm(self):
+        while True:
+            with self._available:
+                if self._spawned >= self.size:
+                    return
+                self._spawned += 1
+            self._put_idle(self._spawn())
+
+    @contextmanager
+    def lease(self, profile=None):
+        driver = self._checkout()
+        try:
+            apply_profile(driver, profile)
+            yield driver
+        finally:
+            self._checkin(driver)
+
+    # Number of pages a request may scrape at once - one leased browser each, capped at the pool size
+    def max_concurrency(self, requested):
+        return max(1, min(int(requested or 1), self.size))
+
+    def stats(self):
+        with self._available:
+            return {
+                'size': self.size,
+                'spawned': self._spawned,
+                'leased': self._leased,
+                'idle': len(self._idle)
+            }
+
+    def shutdown(self):
+        with self._available:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._discard(driver)
+
+    def _spawn(self):
+        try:
+            return create_driver()
+        except Exception:
+            self._free_slot()
+            raise
+
+    # Take the most recently used idle browser, or a free slot to spawn one in, waiting up to the lease timeout for either
+    def _checkout(self):
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            with self._available:
+                while not self._idle and self._spawned >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RuntimeError(f"No browser became available within {self.lease_timeout}s")
+                    self._available.wait(remaining)
+
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    self._spawned += 1
+                    driver = None
+
+            if driver is None:
+                driver = self._spawn()
+
+            # Replace browsers that crashed or were closed while idle
+            if self._is_healthy(driver):
+                with self._available:
+                    self._leased += 1
+                return driver
+
+            self._discard(driver)
+
+    def _checkin(self, driver):
+        with self._available:
+            self._leased -= 1
+
+        try:
+            self._reset(driver)
+        except WebDriverException:
+            self._discard(driver)
+            return
+
+        self._put_idle(driver)
+
+    def _put_idle(self, driver):
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def _free_slot(self):
+        with self._available:
+            self._spawned -= 1
+            self._available.notify()
+
+    # Return the browser to a single blank tab so the next lease starts clean
+    def _reset(self, driver):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get('about:blank')
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return len(driver.window_handles) > 0
+        except WebDriverException:
+            return False
+
+    def _discard(self, driver):
+        self._free_slot()
+        closed = True
+        try:
+            driver.quit()
+        except WebDriverException:
+            closed = False
+
+        # Keep what this browser learned (consent, cached assets) for the next run,
+        # unless it died mid-write and the profile may be inconsistent
+        profile_dir = getattr(driver, 'profile_dir', None)
+        if profile_dir:
+            if closed:
+                save_profile(profile_dir)
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+driver_pool = DriverPool(DRIVER_POOL_SIZE, DRIVER_LEASE_TIMEOUT)
+atexit.register(driver_pool.shutdown)
+metrics.register_gauge('driver_pool', driver_pool.stats)
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import threading
+import metrics
+
+# Where journals of in-progress scrapes are kept, and how many records go to the database per write
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints"))
+CHECKPOINT_FLUSH_SIZE = int(os.getenv("CHECKPOINT_FLUSH_SIZE", "25"))
+
+# Request fields that change how a scrape runs but not what it scrapes
+CONTROL_FIELDS = {'async', 'resume', 'concurrency'}
+
+# The same request always maps to the same token, so resending it with "resume": true picks up where it stopped
+def resume_token(kind, data):
+    params = {key: value for key, value in data.items() if key not in CONTROL_FIELDS}
+    return hashlib.sha256(f"{kind} {json.dumps(params, sort_keys=True)}".encode()).hexdigest()[:16]
+
+def item_key(item):
+    return json.dumps(item, sort_keys=True)
+
+# Append-only journal of a link loop: every parsed record is written as soon as it arrives,
+# then handed to `write` in chunks, and the journal notes how many records have reached the database
+#   {"item": ..., "record": ...}   a link that was scraped and parsed
+#   {"flushed": n}                 the first n records are in the database
+#   {"flushed": n, "retry": [...]} ... except the records of these links, which `write` handed back as not stored
+# `write` raises if the chunk could not be stored at all, or returns the records it couldn't store; their links are
+# scraped again on resume, and the journal is kept until they are in
+class Journal:
+    def __init__(self, kind, data, write, flush_size=CHECKPOINT_FLUSH_SIZE):
+        self.kind = kind
+        self.write = write
+        self.flush_size = flush_size
+        self.token = data.get('resume') if isinstance(data.get('resume'), str) else resume_token(kind, data)
+        self.path = os.path.join(CHECKPOINT_DIR, f"{kind}-{os.path.basename(self.token)}.ndjson")
+        self.records = []
+        self.items = []
+        self.flushed = 0
+        self.unwritten = 0
+        self._done = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        if data.get('resume'):
+            self._load()
+            metrics.increment(f"checkpoint.{kind}.resumed")
+        self._file = open(self.path, 'a' if data.get('resume') else 'w')
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash - the link it belongs to is simply scraped again
+                continue
+            if 'flushed' in entry:
+                self.flushed = entry['flushed']
+                for item in entry.get('retry', []):
+                    self._done.discard(item_key(item))
+            else:
+                self.records.append(entry['record'])
+                self.items.append(entry['item'])
+                self._done.add(item_key(entry['item']))
+
+    def done(self, item):
+        return item_key(item) in self._done
+
+    def pending(self, items):
+        return [item for item in items if not self.done(item)]
+
+    def add(self, item, record):
+        with self._lock:
+            self._file.write(json.dumps({'item': item, 'record': record}) + '\n')
+            self._file.flush()
+            self.records.append(record)
+            self.items.append(item)
+            self._done.add(item_key(item))
+            ready = len(self.records) - self.flushed >= self.flush_size
+        if ready:
+            self.flush()
+
+    # Write every record not yet in the database, then journal that they are
+    def flush(self):
+        with self._lock:
+            chunk = self.records[self.flushed:]
+            if not chunk:
+                return
+            unwritten = {id(record) for record in self.write(chunk) or []}
+            retry = [item for item, record in zip(self.items[self.flushed:], chunk) if id(record) in unwritten]
+            for item in retry:
+                self._done.discard(item_key(item))
+            self.flushed += len(chunk)
+            self.unwritten += len(retry)
+            self._file.write(json.dumps({'flushed': self.flushed, 'retry': retry} if retry else {'flushed': self.flushed}) + '\n')
+            self._file.flush()
+        metrics.increment(f"checkpoint.{self.kind}.flushed", len(chunk) - len(retry))
+        if retry:
+            metrics.increment(f"checkpoint.{self.kind}.unwritten", len(retry))
+
+    # Flush what's left; the journal is only kept if some links, or records that didn't reach the database, need another attempt
+    def finish(self, complete):
+        self.flush()
+        self._file.close()
+        if complete and not self.unwritten:
+            os.remove(self.path)
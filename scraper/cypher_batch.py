@@ -0,0 +1,96 @@
+import os
+import time
+import metrics
+
+# Rows sent per UNWIND statement; each statement commits as its own transaction
+CYPHER_BATCH_SIZE = int(os.getenv("CYPHER_BATCH_SIZE", "500"))
+
+# The statement a row template runs as. The template reads each record as `row`,
+# so its text - and the plan the server caches for it - is the same whatever the records hold
+def statement(template):
+    return f"CYPHER 25\nUNWIND $rows AS row\n{template}"
+
+# Transaction function for one chunk. The driver calls it again on a transient error (deadlock, leader switch,
+# dropped connection); templates only MERGE and SET by key, so replaying a chunk is harmless
+def write_chunk(tx, template, rows, params, attempts):
+    attempts.append(time.monotonic())
+    if len(attempts) > 1:
+        metrics.increment('cypher.retries')
+    tx.run(statement(template), rows=rows, **params).consume()
+
+# Records normalised to a fixed set of templates, grouped by template and by the statement-level parameters
+# (labels such as $type and $draw) they run with. Groups are written in the order they were first added,
+# so rows that need nodes from another template (a Score needs its Match) are added after them
+class Batch:
+    def __init__(self, batch_size=CYPHER_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.groups = {}
+
+    def add(self, template, row, **params):
+        key = (template, tuple(sorted(params.items())))
+        self.groups.setdefault(key, []).append(row)
+
+    def __len__(self):
+        return sum(len(rows) for rows in self.groups.values())
+
+    # Commit chunk by chunk through the database's pool (database.py), so locks and server memory are held for one
+    # chunk at a time and a failure costs only the chunk it happened in - every chunk before it is already committed
+    def write(self, graph, name='batch'):
+        total = len(self)
+        done = 0
+        started = time.monotonic()
+
+        for (template, params), rows in self.groups.items():
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                attempts = []
+                try:
+                    graph.write(write_chunk, template, chunk, dict(params), attempts)
+                except Exception:
+                    print(f"{name}: chunk of {len(chunk)} rows failed after {len(attempts)} attempts, {done}/{total} rows committed")
+                    raise
+                metrics.record_timing('cypher.chunk', time.monotonic() - attempts[-1])
+                metrics.increment('cypher.chunks')
+                metrics.increment('cypher.rows', len(chunk))
+
+                done += len(chunk)
+                if total > self.batch_size:
+                    print(progress(name, done, total, started))
+
+        metrics.record_timing(f"cypher.{name}", time.monotonic() - started)
+        return done
+
+# Batched writes for a stream of records: rows are grouped as in Batch, and everything waiting is committed once
+# batch_size rows have built up, so memory stays bounded however long the stream and writing starts with its first records.
+# A flush writes its groups in the order they were started, so a row still never lands before the rows it needs
+class StreamWriter:
+    def __init__(self, graph, name='stream', batch_size=CYPHER_BATCH_SIZE):
+        self.graph = graph
+        self.name = name
+        self.batch_size = batch_size
+        self.batch = Batch(batch_size)
+        self.done = 0
+        self.started = time.monotonic()
+
+    def add(self, template, row, **params):
+        self.batch.add(template, row, **params)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch.groups:
+            return
+        self.done += self.batch.write(self.graph, self.name)
+        self.batch = Batch(self.batch_size)
+        print(progress(self.name, self.done, None, self.started))
+
+    def close(self):
+        self.flush()
+        return self.done
+
+def progress(name, done, total, started):
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed > 0 else 0
+    if total is None:
+        return f"{name}: {done} rows, {rate:.0f} rows/s"
+    return f"{name}: {done}/{total} rows ({done * 100 // total}%), {rate:.0f} rows/s"
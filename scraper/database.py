@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError, DriverError
+import metrics
+
+# Connection pool settings shared by every Neo4j driver in the process
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+NEO4J_POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", "50"))
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "30"))
+# How long a session waits for a free pooled connection before failing
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+NEO4J_CONNECTION_LIFETIME = float(os.getenv("NEO4J_CONNECTION_LIFETIME", "3600"))
+# Idle connections older than this are pinged before reuse, so one the server dropped is replaced instead of failing a query
+NEO4J_LIVENESS_CHECK = float(os.getenv("NEO4J_LIVENESS_CHECK", "30"))
+# How long a transaction keeps being retried on transient errors before the error is raised
+NEO4J_RETRY_SECONDS = float(os.getenv("NEO4J_RETRY_SECONDS", "30"))
+
+# One lazily created driver per database the process talks to. Sessions are cheap and borrow connections
+# from the driver's pool, so concurrent requests share connections instead of each opening (and TLS-handshaking) its own
+class Database:
+    def __init__(self, name, uri, auth):
+        self.name = name
+        self.uri = uri
+        self.auth = auth
+        self._driver = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._peak = 0
+        self._opened = 0
+
+    def driver(self):
+        with self._lock:
+            if self._driver is None:
+                self._driver = GraphDatabase.driver(
+                    self.uri,
+                    auth=self.auth,
+                    max_connection_pool_size=NEO4J_POOL_SIZE,
+                    connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+                    connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+                    max_connection_lifetime=NEO4J_CONNECTION_LIFETIME,
+                    liveness_check_timeout=NEO4J_LIVENESS_CHECK,
+                    max_transaction_retry_time=NEO4J_RETRY_SECONDS
+                )
+                metrics.increment(f"neo4j.{self.name}.drivers")
+            return self._driver
+
+    @contextmanager
+    def session(self):
+        driver = self.driver()
+        with self._lock:
+            self._active += 1
+            self._opened += 1
+            self._peak = max(self._peak, self._active)
+        started = time.monotonic()
+        try:
+            with driver.session(database=NEO4J_DATABASE) as session:
+                yield session
+        finally:
+            metrics.record_timing(f"neo4j.{self.name}.session", time.monotonic() - started)
+            with self._lock:
+                self._active -= 1
+
+    # One managed transaction in a short-lived session: the connection goes back to the pool as soon as it commits,
+    # so long scrapes that write in chunks don't pin a connection between chunks
+    def write(self, fn, *args):
+        with self.session() as session:
+            return session.execute_write(fn, *args)
+
+    def read(self, fn, *args):
+        with self.session() as session:
+            return session.execute_read(fn, *args)
+
+    def health(self):
+        started = time.monotonic()
+        try:
+            self.driver().verify_connectivity()
+        except (Neo4jError, DriverError, OSError) as e:
+            return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        return {'ok': True, 'latency': round(time.monotonic() - started, 3)}
+
+    # A session holds at most one connection at a time, so active sessions against the pool size bounds the pool's utilisation
+    def stats(self):
+        with self._lock:
+            return {
+                'connected': self._driver is not None,
+                'pool_size': NEO4J_POOL_SIZE,
+                'active_sessions': self._active,
+                'peak_sessions': self._peak,
+                'sessions_opened': self._opened,
+                'utilisation': round(self._active / NEO4J_POOL_SIZE, 3)
+            }
+
+    def close(self):
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            driver.close()
+
+_databases = {}
+_lock = threading.Lock()
+
+# The process-wide handle for a database, registered once per name
+def connect(name, uri, auth):
+    with _lock:
+        if name not in _databases:
+            _databases[name] = Database(name, uri, auth)
+            metrics.register_gauge(f"neo4j.{name}", _databases[name].stats)
+        return _databases[name]
+
+def health():
+    with _lock:
+        databases = list(_databases.values())
+    return {database.name: database.health() for database in databases}
+
+# Close every driver on shutdown so in-flight connections are returned and the server sees clean goodbyes;
+# called when the app stops serving (main.py) and when the command-line tools finish
+def close_all():
+    with _lock:
+        databases = list(_databases.values())
+    for database in databases:
+        database.close()
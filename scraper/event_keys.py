@@ -0,0 +1,76 @@
+# Ids of one event's rounds, entries and matches, read once up front so bulk loaders write by exact id
+# instead of scanning with STARTS WITH / CONTAINS for every record. Lookups take the labels the old
+# queries matched on (e.g. 'Doubles', 'Main') and return the id of the node carrying all of them, or None
+class EventKeys:
+    def __init__(self, eid):
+        self.eid = eid
+        self.rounds = {}
+        self.entries = {}
+        self.matches = {}
+
+    def add(self, index, key, node_id, labels):
+        index.setdefault(key, []).append((frozenset(labels), node_id))
+
+    def pick(self, index, key, labels):
+        for node_labels, node_id in index.get(key, []):
+            if node_labels.issuperset(labels):
+                return node_id
+        return None
+
+    def round(self, name, *labels):
+        return self.pick(self.rounds, name, labels)
+
+    # An entry is keyed by its players, whatever order a file lists them in
+    def entry(self, players, *labels):
+        return self.pick(self.entries, frozenset(players), labels)
+
+    def match(self, match_no, *labels):
+        return self.pick(self.matches, match_no, labels)
+
+# Read transaction function: session.execute_read(resolve_event_keys, '5802025-ATP'). Every id below is
+# prefixed with the event id, so each query is one range seek on the id index (see schema.py)
+def resolve_event_keys(db, eid):
+    keys = EventKeys(eid)
+
+    for record in db.run("MATCH (r:Round) WHERE r.id STARTS WITH $eid RETURN r.id AS id, r.round AS round, labels(r) AS labels", eid=eid):
+        keys.add(keys.rounds, record['round'], record['id'], record['labels'])
+
+    # Entry ids are the event id followed by the entry's player ids
+    for record in db.run("MATCH (f:Entry) WHERE f.id STARTS WITH $eid RETURN f.id AS id, labels(f) AS labels", eid=eid):
+        keys.add(keys.entries, frozenset(record['id'][len(eid):].split()), record['id'], record['labels'])
+
+    for record in db.run("MATCH (m:Match) WHERE m.id STARTS WITH $eid RETURN m.id AS id, m.match_no AS match_no, labels(m) AS labels", eid=eid):
+        keys.add(keys.matches, record['match_no'], record['id'], record['labels'])
+
+    return keys
+
+# Score ids of an event by player, read once before a stats scrape so each match's stats are written by exact Score id
+# rather than found by walking Player-Entry-Score-Match-Score-Entry-Player. A Score id is its Match id followed by
+# the ids of the players it belongs to (see the draw ingestion in atp_scrapers.py / wta_scrapers.py)
+class ScoreKeys:
+    def __init__(self):
+        self.players = {}
+
+    def add(self, score_id, match_id):
+        for player in score_id[len(match_id):].split():
+            self.players.setdefault(player, {})[match_id] = score_id
+
+    # (match id, score id of p1's side, score id of p2's side) for every stored match between the two players
+    def pairs(self, p1, p2):
+        mine = self.players.get(p1, {})
+        theirs = self.players.get(p2, {})
+        return [(match_id, mine[match_id], theirs[match_id]) for match_id in mine if match_id in theirs and mine[match_id] != theirs[match_id]]
+
+# Read transaction function: session.execute_read(resolve_score_keys, '5802025-ATP S ', 'ATP').
+# Only Scores carrying every label are kept, which tells apart WTA ids that repeat across draws
+def resolve_score_keys(db, prefix, *labels):
+    keys = ScoreKeys()
+    result = db.run("""
+        MATCH (s:Score) WHERE s.id STARTS WITH $prefix
+        MATCH (s)-[:SCORED]->(m:Match)
+        RETURN s.id AS id, m.id AS match, labels(s) AS labels
+    """, prefix=prefix)
+    for record in result:
+        if set(labels).issubset(record['labels']):
+            keys.add(record['id'], record['match'])
+    return keys
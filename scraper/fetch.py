@@ -0,0 +1,189 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from browser import driver_pool, profile_for
+from waits import wait_for_page
+from throttle import scheduler
+from extractors import extract, has_extractor
+import page_cache
+import metrics
+
+# Site roots, overridable so the fetch layer can be pointed at a local fixture server
+ATP_BASE_URL = os.getenv("ATP_BASE_URL", "https://www.atptour.com")
+WTA_BASE_URL = os.getenv("WTA_BASE_URL", "https://www.wtatennis.com")
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+# After this many consecutive fallbacks a page type stops trying plain HTTP for HTTP_RETRY_AFTER seconds,
+# then probes it again: one success brings it back, one more fallback pauses it for another period
+HTTP_FALLBACK_LIMIT = int(os.getenv("HTTP_FALLBACK_LIMIT", "5"))
+HTTP_RETRY_AFTER = int(os.getenv("HTTP_RETRY_AFTER", "600"))
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+# Fetch rules per page type
+#   required: selectors that must be in the HTML for the parser to work
+#   tier:     'http' to try a plain request first, 'browser' to always render with Selenium
+#   fragments: when rendering, keep only these elements' outerHTML instead of the whole page
+#              (page types with an in-browser extractor in extractors.py store its JSON fields instead)
+#   wait:     the waits.py rule to render with, defaulting to the rule of the same name
+PAGE_TYPES = {
+    'wta_player': {
+        'required': ['.page-hero section', '.page-hero script[type="application/ld+json"]', '.page-content .profile-bio__info-block'],
+        'tier': 'http'
+    },
+    'wta_stats': {
+        'required': ['header.page-hero script[type="application/ld+json"]', '#match-stats .js-match-stats .compare-stats-block__row'],
+        'tier': 'http'
+    },
+    'atp_results': {
+        'required': ['.atp_accordion-items .atp_accordion-item'],
+        'tier': 'http'
+    },
+    'atp_draw': {
+        'required': ['.atp-draw-container .draw .draw-header'],
+        'tier': 'http',
+        'fragments': ['.atp-draw-container']
+    },
+    'atp_stats': {
+        'required': ['.RGMatchStats', '#Stat-header'],
+        'tier': 'browser',
+        'fragments': ['.atp_layout-container']
+    },
+    'atp_old_stats': {
+        'required': ['.atp_match-stats'],
+        'tier': 'browser',
+        'fragments': ['.atp_match-stats']
+    },
+    'atp_activity': {
+        'required': ['.atp_player-activity'],
+        'tier': 'browser',
+        'fragments': ['.atp_player-activity']
+    },
+    'wta_draw': {
+        'required': ['section.tournament-draw'],
+        'tier': 'browser',
+        'fragments': ['section.tournament-draw']
+    },
+    'wta_match': {
+        'required': ['section.mc-live-score', '#match-stats', '#match-details'],
+        'tier': 'browser',
+        'fragments': ['section.mc-live-score', '#match-stats', '#match-details'],
+        'wait': 'wta_stats'
+    }
+}
+
+# Pooled keep-alive session shared by every endpoint
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+session.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+_lock = threading.Lock()
+_fallback_streaks = {}
+_http_paused_until = {}
+
+def has_selectors(html, selectors):
+    soup = BeautifulSoup(html, 'html.parser')
+    return all(soup.select_one(selector) is not None for selector in selectors)
+
+def http_enabled(page_type):
+    if PAGE_TYPES[page_type]['tier'] != 'http':
+        return False
+    with _lock:
+        return _http_paused_until.get(page_type, 0) <= time.monotonic()
+
+def fetch_http(url, page_type):
+    started = time.monotonic()
+    try:
+        with scheduler.slot(url) as outcome:
+            response = session.get(url, timeout=HTTP_TIMEOUT)
+            outcome.status = response.status_code
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                outcome.retry_after = int(retry_after)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+    finally:
+        metrics.record_timing(f"fetch.{page_type}.http", time.monotonic() - started)
+
+    return response.text if response.ok else None
+
+# Render a page, returning its HTML and the waits.py outcome it was captured on ('ready' or 'idle')
+def render(url, page_type):
+    config = PAGE_TYPES[page_type]
+    started = time.monotonic()
+    # Wait for the host's slot before leasing, so a pooled browser is never held idle behind the rate limit.
+    # Only the navigation is timed for the rate: the pool wait and the readiness waits would read as a slow host
+    with scheduler.slot(url) as request, driver_pool.lease(profile_for(url)) as driver:
+        with request.timing():
+            driver.get(url)
+        outcome = wait_for_page(driver, config.get('wait', page_type))
+        if has_extractor(page_type):
+            html = extract(driver, page_type)
+        elif config.get('fragments'):
+            html = ''.join(driver.find_element(By.CSS_SELECTOR, selector).get_attribute('outerHTML') for selector in config['fragments'])
+        else:
+            html = driver.page_source
+    metrics.record_timing(f"fetch.{page_type}.browser", time.monotonic() - started)
+    return html, outcome
+
+# Get a page's HTML from the page cache, over plain HTTP when it already carries what the parser needs,
+# or otherwise by rendering it
+def get_page(url, page_type, context=None):
+    html = page_cache.get(url, page_type)
+    if html is not None:
+        return html
+
+    html, ready = fetch_page(url, page_type)
+    page_cache.put(url, page_type, html, context, ready)
+    return html
+
+# A page's HTML and whether it holds what the parser needs: always over HTTP, which checks for it,
+# but not for a render that gave up waiting on a quiet network
+def fetch_page(url, page_type):
+    if http_enabled(page_type):
+        html = fetch_http(url, page_type)
+        if html is not None and has_selectors(html, PAGE_TYPES[page_type]['required']):
+            with _lock:
+                _fallback_streaks[page_type] = 0
+                _http_paused_until.pop(page_type, None)
+            metrics.increment(f"fetch.{page_type}.http")
+            return html, True
+
+        with _lock:
+            _fallback_streaks[page_type] = _fallback_streaks.get(page_type, 0) + 1
+            paused = _fallback_streaks[page_type] >= HTTP_FALLBACK_LIMIT
+            if paused:
+                _http_paused_until[page_type] = time.monotonic() + HTTP_RETRY_AFTER
+        metrics.increment(f"fetch.{page_type}.fallback")
+        if paused:
+            metrics.increment(f"fetch.{page_type}.http_paused")
+
+    metrics.increment(f"fetch.{page_type}.browser")
+    html, outcome = render(url, page_type)
+    return html, outcome == 'ready'
+
+def fetch_stats():
+    now = time.monotonic()
+    with _lock:
+        return {
+            page_type: {
+                'tier': config['tier'],
+                'http_enabled': config['tier'] == 'http' and _http_paused_until.get(page_type, 0) <= now,
+                'http_paused_for': max(0, round(_http_paused_until.get(page_type, 0) - now)),
+                'fallback_streak': _fallback_streaks.get(page_type, 0)
+            }
+            for page_type, config in PAGE_TYPES.items()
+        }
+
+metrics.register_gauge('fetch', fetch_stats)
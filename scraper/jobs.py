@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, jsonify
+from server import app
+import metrics
+
+# Where job state and results are kept, and how many jobs run at once
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Progress is written to disk at most this often while a job runs
+JOB_SAVE_INTERVAL = float(os.getenv("JOB_SAVE_INTERVAL", "1.0"))
+
+# A scrape's state, shared between the worker running it and the clients polling it
+class Job:
+    def __init__(self, kind, params, job_id=None, persist=True):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.persist = persist
+        self.status = 'queued'
+        self.total = None
+        self.done = 0
+        self.failed = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._saved_at = 0
+        self._lock = threading.Lock()
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+        self.save()
+
+    # Matches run_parallel's on_result, so endpoints can pass it straight through
+    def on_result(self, index, item, result, error):
+        with self._lock:
+            self.done += 1
+            if error is not None:
+                self.failed.append({'item': item, 'error': f"{type(error).__name__}: {error}"})
+        self.save(force=False)
+
+    def eta(self):
+        if not self.started_at or not self.total or not self.done or self.finished_at:
+            return None
+        elapsed = time.time() - self.started_at
+        return round(elapsed / self.done * (self.total - self.done), 1)
+
+    def to_dict(self, include_result=True):
+        with self._lock:
+            job = {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'params': self.params,
+                'total': self.total,
+                'done': self.done,
+                'failed': list(self.failed),
+                'eta': self.eta(),
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+            if include_result:
+                job['result'] = self.result
+        return job
+
+    def save(self, force=True):
+        if not self.persist:
+            return
+        now = time.time()
+        if not force and now - self._saved_at < JOB_SAVE_INTERVAL:
+            return
+        self._saved_at = now
+
+        path = job_path(self.id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+def job_path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+_lock = threading.Lock()
+_jobs = {}
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+
+def _run(job, fn):
+    job.status = 'running'
+    job.started_at = time.time()
+    job.save()
+    try:
+        job.result = fn(job.params, job)
+        job.status = 'done'
+        metrics.increment(f"jobs.{job.kind}.done")
+    except Exception as e:
+        traceback.print_exc()
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = 'failed'
+        metrics.increment(f"jobs.{job.kind}.failed")
+    finally:
+        job.finished_at = time.time()
+        job.save()
+        metrics.record_timing(f"jobs.{job.kind}", job.finished_at - job.started_at)
+
+# Queue fn(params, job) on the worker pool and return the job straight away
+def submit(kind, fn, params):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    job = Job(kind, params)
+    job.save()
+    with _lock:
+        _jobs[job.id] = job
+    _executor.submit(_run, job, fn)
+    return job
+
+# Job state as a dict, from memory for this process's jobs or from the store for earlier ones
+def get(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job.to_dict()
+
+    try:
+        with open(job_path(os.path.basename(job_id))) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # A job the previous process never finished won't be picked up again
+    if stored['status'] in ('queued', 'running'):
+        stored['status'] = 'interrupted'
+    return stored
+
+# Run an endpoint's work inline, or as a background job when the request body asks for it with "async": true
+def respond(kind, fn, data):
+    if data.get('async'):
+        job = submit(kind, fn, data)
+        return jsonify({'job_id': job.id, 'status': job.status, 'url': f"/jobs/{job.id}"}), 202
+
+    return jsonify(fn(data, Job(kind, data, persist=False)))
+
+def job_stats():
+    with _lock:
+        jobs = list(_jobs.values())
+    statuses = {}
+    for job in jobs:
+        statuses[job.status] = statuses.get(job.status, 0) + 1
+    return {'workers': JOB_WORKERS, **statuses}
+
+metrics.register_gauge('jobs', job_stats)
+
+# Endpoint to poll a job's progress and, once done, its result
+@app.route("/jobs/<job_id>", methods=['GET'])
+def get_job(job_id):
+    job = get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+# Endpoint to stream a job's progress as server-sent events until it finishes
+@app.route("/jobs/<job_id>/events", methods=['GET'])
+def stream_job(job_id):
+    if get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        last = None
+        while True:
+            job = get(job_id)
+            finished = job['status'] not in ('queued', 'running')
+            if not finished:
+                job.pop('result', None)
+            event = json.dumps(job)
+            if event != last:
+                yield f"data: {event}\n\n"
+                last = event
+            if finished:
+                return
+            time.sleep(1)
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
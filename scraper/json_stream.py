@@ -0,0 +1,100 @@
+import json
+
+# Characters read from the file at a time
+READ_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+# Characters that carry on a number: a read ending in "12." or "12e" decodes as 12, short of what the text holds
+NUMBER_CHARS = set('0123456789+-.eE')
+
+# Incremental reader over a JSON text: values are decoded one at a time from a sliding buffer,
+# so only the value being decoded (plus one read) is ever in memory
+class Reader:
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        data = self.f.read(READ_SIZE)
+        if not data:
+            self.eof = True
+            return
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+
+    # Next non-whitespace character, without consuming it ('' at the end of the file)
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A value running to the end of the buffer may continue in the next read (e.g. a number cut in two)
+                cut = isinstance(value, (int, float)) and not isinstance(value, bool) and self.buffer[end:end + 1] in NUMBER_CHARS
+                if (end < len(self.buffer) and not cut) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    # Step into the value at `step`: an index of the current array or a key of the current object
+    def descend(self, step):
+        if isinstance(step, int):
+            self.expect('[')
+            for _ in range(step):
+                self.value()
+                self.expect(',')
+            return
+
+        self.expect('{')
+        while self.peek() != '}':
+            key = self.value()
+            self.expect(':')
+            if key == step:
+                return
+            self.value()
+            if self.peek() == ',':
+                self.pos += 1
+        raise KeyError(step)
+
+    def items(self):
+        self.expect('[')
+        while self.peek() != ']':
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+        self.pos += 1
+
+# Records of an export, one at a time: the items of a JSON array, or one record per line of an NDJSON file.
+# `pointer` is the path to an array nested in the document, e.g. (0, 'match') for [{"match": [...]}]
+def iter_records(path, pointer=()):
+    with open(path) as f:
+        reader = Reader(f)
+        if pointer or reader.peek() == '[':
+            for step in pointer:
+                reader.descend(step)
+            yield from reader.items()
+            return
+
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
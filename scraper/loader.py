@@ -0,0 +1,219 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from dotenv import dotenv_values
+import database
+from parallel import run_parallel
+from cypher_batch import StreamWriter
+from json_stream import iter_records
+from event_keys import resolve_event_keys
+
+# Bulk loader for match and score exports, one event per job:
+#   python loader.py matches --event 5802025 --tour ATP --type Doubles --draw Main --pointer 0.match ao_atp_doubles.json
+#   python loader.py scores --event 5402025 --tour WTA --type Doubles --draw Main wimbledon_wta_doubles_main.json
+#   python loader.py --manifest season.json --workers 8
+# A manifest is a JSON array (or NDJSON) of jobs: {"kind", "event", "tour", "type", "draw", "files", "pointer"}
+
+# Neo4j credentials of each tour's database
+CREDENTIALS = {
+    'ATP': "Neo4j-4504c504-Created-2025-10-19.txt",
+    'WTA': "Neo4j-a4c75a44-Created-2025-03-21.txt"
+}
+
+# Events loaded at once, and Neo4j sessions they share
+LOADER_WORKERS = int(os.getenv("LOADER_WORKERS", "4"))
+LOADER_SESSIONS = int(os.getenv("LOADER_SESSIONS", "4"))
+
+# A database handle that lets at most `limit` sessions write at once, however many events are loading
+class BoundedGraph:
+    def __init__(self, graph, limit):
+        self.graph = graph
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def write(self, fn, *args):
+        with self._slots:
+            return self.graph.write(fn, *args)
+
+    def read(self, fn, *args):
+        with self._slots:
+            return self.graph.read(fn, *args)
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+def connect(tour, sessions):
+    with _graphs_lock:
+        if tour not in _graphs:
+            config = dotenv_values(CREDENTIALS[tour])
+            if not config:
+                raise RuntimeError(f"Credentials for {tour} not loaded from {CREDENTIALS[tour]}")
+            graph = database.connect(tour.lower(), config.get("NEO4J_URI"), (config.get("NEO4J_USERNAME"), config.get("NEO4J_PASSWORD")))
+            _graphs[tour] = BoundedGraph(graph, sessions)
+        return _graphs[tour]
+
+# Ids in the exports carry only the event id; stored ids also name the tour, type and draw ("5802025-ATP D M 12")
+def id_prefix(job):
+    return f"{job['event']}-{job['tour']} {job['type'][0]} {job['draw'][0]}"
+
+def normalise_matches(items, job):
+    for item in items:
+        date_obj = item['properties'].get('date')
+        duration_obj = item['properties'].get('duration')
+
+        item['properties']['id'] = item['properties']['id'].replace(job['event'], id_prefix(job))
+
+        if (date_obj is not None):
+            item['properties']['date'] = f"{date_obj['year']}-{date_obj['month']}-{date_obj['day']}"
+
+        if (duration_obj is not None):
+            hours = duration_obj['seconds'] // 3600
+            minutes = (duration_obj['seconds'] % 3600) // 60
+            seconds = duration_obj['seconds'] % 60
+            item['properties']['duration'] = {
+                'hours': hours,
+                'minutes': minutes,
+                'seconds': seconds
+            }
+        yield item
+
+def normalise_scores(items, job):
+    for item in items:
+        params = item['match']
+        params['score1_properties']['id'] = params['score1_properties']['id'].replace(job['event'], id_prefix(job))
+        params['score2_properties']['id'] = params['score2_properties']['id'].replace(job['event'], id_prefix(job))
+        yield params
+
+MATCH_TEMPLATE = """
+    MATCH (r:Round:$($type) {id: row.round})
+    MERGE (m:Match:$($labels) {id: row.properties.id})
+    MERGE (m)-[:PLAYED]->(r)
+    SET m.date = date(row.properties.date), m.duration = duration(row.properties.duration), m.match_no = row.properties.match_no, m.court = row.properties.court
+"""
+
+SCORE_TEMPLATE = """
+    MATCH (m:Match:$($tour):$($type):$($draw) {id: row.match})
+    MATCH (f1:Entry {id: row.entry1})
+    MATCH (f2:Entry {id: row.entry2})
+    MERGE (s1:$($score1_labels) {id: row.score1_properties.id})
+    MERGE (s2:$($score2_labels) {id: row.score2_properties.id})
+    SET s1 += row.score1_properties
+    SET s2 += row.score2_properties
+    MERGE (f1)-[:SCORED]->(s1)
+    MERGE (f2)-[:SCORED]->(s2)
+    MERGE (s1)-[:SCORED]->(m)
+    MERGE (s2)-[:SCORED]->(m)
+"""
+
+def write_matches(writer, keys, matches, job, summary):
+    for match in matches:
+        summary['records'] += 1
+        round_id = keys.round(match['round'], job['tour'], job['type'], job['draw'])
+        if round_id is None:
+            print(f"{writer.name}: no round {match['round']} for {match['properties']['id']}")
+            summary['skipped'] += 1
+            continue
+        writer.add(MATCH_TEMPLATE, {'round': round_id, 'properties': match['properties']}, labels=tuple(match['labels']), type=job['type'])
+
+# An export gives an entry as its players' ids, or a singles entry as the one id on its own; entries are keyed by id strings
+def entry_players(entry):
+    players = [entry] if isinstance(entry, (str, int)) else entry
+    return [str(player) for player in players]
+
+def write_scores(writer, keys, matches, job, summary):
+    for params in matches:
+        summary['records'] += 1
+        row = {
+            'match': keys.match(params['match_no'], 'Match', job['tour'], job['type'], job['draw']),
+            'entry1': keys.entry(entry_players(params['entry1']), job['type']),
+            'entry2': keys.entry(entry_players(params['entry2']), job['type']),
+            'score1_properties': params['score1_properties'],
+            'score2_properties': params['score2_properties']
+        }
+        if None in (row['match'], row['entry1'], row['entry2']):
+            print(f"{writer.name}: match {params['match_no']} or its entries are not in the draw")
+            summary['skipped'] += 1
+            continue
+        writer.add(SCORE_TEMPLATE, row, score1_labels=tuple(params['score1_labels']), score2_labels=tuple(params['score2_labels']), tour=job['tour'], type=job['type'], draw=job['draw'])
+
+LOADERS = {
+    'matches': (normalise_matches, write_matches),
+    'scores': (normalise_scores, write_scores)
+}
+
+# Load one job's files: resolve the event's ids once, then stream every file through its normalisation into the writer
+def load(job, sessions=LOADER_SESSIONS):
+    started = time.monotonic()
+    name = f"{job['event']}-{job['tour']} {job['type']} {job['draw']} {job['kind']}"
+    summary = {'job': name, 'records': 0, 'written': 0, 'skipped': 0}
+
+    graph = connect(job['tour'], sessions)
+    keys = graph.read(resolve_event_keys, f"{job['event']}-{job['tour']}")
+    normalise, write = LOADERS[job['kind']]
+
+    writer = StreamWriter(graph, name)
+    for path in job['files']:
+        write(writer, keys, normalise(iter_records(path, job.get('pointer', ())), job), job, summary)
+    summary['written'] = writer.close()
+    summary['seconds'] = round(time.monotonic() - started, 1)
+    return summary
+
+# "0.match" -> (0, 'match')
+def parse_pointer(text):
+    return tuple(int(step) if step.isdigit() else step for step in text.split('.')) if text else ()
+
+def manifest_jobs(path):
+    jobs = []
+    for job in iter_records(path):
+        job['event'] = str(job['event'])
+        job['files'] = [job['files']] if isinstance(job['files'], str) else job['files']
+        job['pointer'] = parse_pointer(job['pointer']) if isinstance(job.get('pointer'), str) else tuple(job.get('pointer', ()))
+        jobs.append(job)
+    return jobs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load match and score exports into Neo4j")
+    parser.add_argument('kind', nargs='?', choices=sorted(LOADERS))
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--event', help="Tournament id and year, e.g. 5802025")
+    parser.add_argument('--tour', choices=sorted(CREDENTIALS))
+    parser.add_argument('--type', choices=['Singles', 'Doubles'])
+    parser.add_argument('--draw', choices=['Main', 'Qualifying'])
+    parser.add_argument('--pointer', default='', help="Path to the array of records inside each file, e.g. 0.match")
+    parser.add_argument('--manifest', help="JSON array or NDJSON of jobs to load in parallel")
+    parser.add_argument('--workers', type=int, default=LOADER_WORKERS)
+    parser.add_argument('--sessions', type=int, default=LOADER_SESSIONS)
+    args = parser.parse_args()
+
+    if args.manifest:
+        jobs = manifest_jobs(args.manifest)
+    else:
+        if not (args.kind and args.files and args.event and args.tour and args.type and args.draw):
+            parser.error("give a manifest, or a kind, files, --event, --tour, --type and --draw")
+        jobs = [{
+            'kind': args.kind,
+            'event': args.event,
+            'tour': args.tour,
+            'type': args.type,
+            'draw': args.draw,
+            'files': args.files,
+            'pointer': parse_pointer(args.pointer)
+        }]
+
+    failed = []
+
+    def on_result(index, job, summary, error):
+        if error is not None:
+            print(f"{job['event']}-{job['tour']} {job['kind']}: failed, {type(error).__name__}: {error}", file=sys.stderr)
+            failed.append(job)
+        else:
+            rate = summary['written'] / summary['seconds'] if summary['seconds'] else summary['written']
+            print(f"{summary['job']}: {summary['records']} records, {summary['written']} rows written, {summary['skipped']} skipped in {summary['seconds']}s ({rate:.0f} rows/s)")
+
+    try:
+        run_parallel(lambda job: load(job, args.sessions), jobs, args.workers, on_result=on_result)
+    finally:
+        database.close_all()
+    print(f"Loaded {len(jobs) - len(failed)} of {len(jobs)} jobs")
+    sys.exit(1 if failed else 0)
@@ -1,8 +1,22 @@
+import os
 from server import app
+from browser import driver_pool
 import atp_scrapers
 import wta_scrapers
+import schema
+import database
 
 if __name__ == "__main__":
     # Optional: print to verify routes are loaded
     print(app.url_map)
-    app.run(debug=True, host="127.0.0.1", port=5001)
\ No newline at end of file
+    # Pre-spawn browsers in the process that serves requests, not the reloader parent
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        driver_pool.warm()
+        # Constraints and indexes the ingestion queries seek on; idempotent, so it runs on every start
+        if schema.SCHEMA_BOOTSTRAP:
+            schema.prepare([(atp_scrapers.graph, atp_scrapers.INGESTION_QUERIES), (wta_scrapers.graph, wta_scrapers.INGESTION_QUERIES)])
+    # Return the Neo4j connections once the app stops serving, whether it was interrupted or the reloader restarts it
+    try:
+        app.run(debug=True, host="127.0.0.1", port=5001)
+    finally:
+        database.close_all()
\ No newline at end of file
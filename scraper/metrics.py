@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+
+# Number of recent samples kept per timing
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+_gauges = {}
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def record_timing(name, seconds):
+    with _lock:
+        if name not in _timings:
+            _timings[name] = deque(maxlen=MAX_SAMPLES)
+        _timings[name].append(seconds)
+
+# Register a callable that reports a live value (e.g. pool occupancy) in snapshots
+def register_gauge(name, fn):
+    with _lock:
+        _gauges[name] = fn
+
+def summarise(samples):
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'min': round(ordered[0], 3),
+        'avg': round(sum(ordered) / count, 3),
+        'p50': round(ordered[count // 2], 3),
+        'p95': round(ordered[min(count - 1, int(count * 0.95))], 3),
+        'max': round(ordered[-1], 3)
+    }
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        timings = {name: list(samples) for name, samples in _timings.items() if samples}
+        gauges = dict(_gauges)
+
+    return {
+        'counters': counters,
+        'timings': {name: summarise(samples) for name, samples in timings.items()},
+        'gauges': {name: fn() for name, fn in gauges.items()}
+    }
@@ -0,0 +1,37 @@
+# Cleaned-name keys for the people the scrapers only know by name. A name is resolved by comparing
+# apoc.text.clean() of both sides (lowercase, accents and punctuation stripped), so each node keeps the cleaned form
+# of every name it answers to in an indexed property (see schema.py) and lookups seek on it instead of cleaning
+# every node's name per query:
+#   Coach:  name_key (from its id) and full_name_key (from first_name + last_name)
+#   Umpire: name_key (from its id)
+NAME_KEYS = {
+    'Coach': {
+        'name_key': "n.id",
+        'full_name_key': "n.first_name || ' ' || n.last_name"
+    },
+    'Umpire': {
+        'name_key': "n.id"
+    }
+}
+
+# Fill in keys missing from nodes written before the keys existed; the scrapers set them on what they write, so at server
+# start this finds little. A key the names can't give (a coach known only by id has no full_name_key) is left unset.
+# recompute rewrites every key from the names themselves, so nodes renamed since resolve too (schema.py CLI).
+# Runs in its own transactions and is idempotent; cheap next to the rest of the graph, as there are few coaches and umpires
+def backfill(graph, recompute=False):
+    counts = {}
+    with graph.session() as session:
+        for label, keys in NAME_KEYS.items():
+            assignments = ', '.join(f"n.{key} = apoc.text.clean({expression})" for key, expression in keys.items())
+            missing = ' OR '.join(f"(n.{key} IS NULL AND ({expression}) IS NOT NULL)" for key, expression in keys.items())
+            match = f"MATCH (n:{label})" if recompute else f"MATCH (n:{label}) WHERE {missing}"
+            result = session.run(f"""
+                CYPHER 25
+                {match}
+                CALL (n) {{
+                    SET {assignments}
+                }} IN TRANSACTIONS OF 1000 ROWS
+                RETURN count(n) AS nodes
+            """)
+            counts[label] = result.single()['nodes']
+    return counts
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def _call(fn, item):
+    try:
+        return fn(item), None
+    except Exception as e:
+        return None, e
+
+# Run fn over items with up to `concurrency` workers
+# Returns (result, error) pairs in the same order as items, whatever order they finish in
+def run_parallel(fn, items, concurrency=1, on_result=None):
+    items = list(items)
+    outcomes = [None] * len(items)
+
+    if concurrency <= 1 or len(items) <= 1:
+        for index, item in enumerate(items):
+            outcomes[index] = _call(fn, item)
+            if on_result:
+                on_result(index, item, *outcomes[index])
+        return outcomes
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(_call, fn, item): index for index, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            outcomes[index] = future.result()
+            if on_result:
+                on_result(index, items[index], *outcomes[index])
+
+    return outcomes
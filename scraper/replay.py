@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import page_cache
+import parse_backend
+import atp_parsers
+import wta_parsers
+
+# Re-parse stored pages without a browser or network, e.g. after a parser change:
+#   python replay.py --page-type atp_stats --out stats.ndjson
+# Each page becomes one NDJSON line with the records its endpoint would write
+# To check a parse backend against another on the same pages (records must match, times are compared):
+#   python replay.py --backend html.parser --compare lxml
+
+PARSERS = {**atp_parsers.PARSERS, **wta_parsers.PARSERS}
+
+def timed_parse(page_type, body, context):
+    started = time.perf_counter()
+    records = PARSERS[page_type](body, context)
+    return records, time.perf_counter() - started
+
+# Parse a single stored page (runs in a worker process)
+def replay_entry(path, page_types, backend=None, compare=None):
+    if backend:
+        parse_backend.use(backend)
+
+    try:
+        header, body = page_cache.read_entry(path)
+    except (OSError, ValueError) as e:
+        return {'path': path, 'error': str(e)}
+
+    page_type = header.get('page_type')
+    if page_type not in PARSERS or (page_types and page_type not in page_types):
+        return None
+
+    result = {
+        'url': header.get('url'),
+        'page_type': page_type,
+        'context': header.get('context', {})
+    }
+
+    try:
+        result['records'], result['seconds'] = timed_parse(page_type, body, result['context'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    if compare:
+        primary = parse_backend.current()
+        parse_backend.use(compare)
+        try:
+            records, seconds = timed_parse(page_type, body, result['context'])
+            result['compare'] = {'backend': compare, 'seconds': seconds, 'match': records == result['records']}
+        except Exception as e:
+            result['compare'] = {'backend': compare, 'error': f"{type(e).__name__}: {e}", 'match': False}
+        finally:
+            parse_backend.use(primary)
+
+    return result
+
+def replay(cache_dir, page_types=None, workers=None, out=sys.stdout, backend=None, compare=None):
+    paths = list(page_cache.entries(cache_dir))
+    parsed = 0
+    failed = 0
+    mismatched = 0
+    seconds = {'primary': 0, 'compare': 0}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(replay_entry, paths, [page_types] * len(paths), [backend] * len(paths), [compare] * len(paths), chunksize=16):
+            if result is None:
+                continue
+            if 'error' in result:
+                failed += 1
+                print(f"Failed to parse {result.get('url', result.get('path'))}: {result['error']}", file=sys.stderr)
+            else:
+                parsed += 1
+                seconds['primary'] += result['seconds']
+                if compare:
+                    seconds['compare'] += result['compare'].get('seconds', 0)
+                    if not result['compare']['match']:
+                        mismatched += 1
+                        print(f"Backends disagree on {result['url']}", file=sys.stderr)
+            out.write(json.dumps(result) + '\n')
+
+    print(f"Replayed {parsed} pages, {failed} failed, {seconds['primary']:.2f}s parsing with {backend or parse_backend.PARSE_BACKEND}", file=sys.stderr)
+    if compare:
+        print(f"{compare}: {seconds['compare']:.2f}s parsing, {mismatched} pages with different records", file=sys.stderr)
+    return parsed, failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-parse stored pages across a process pool")
+    parser.add_argument('--cache-dir', default=page_cache.CACHE_DIR)
+    parser.add_argument('--page-type', action='append', choices=sorted(PARSERS), help="Only replay these page types (repeatable)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', help="Write records to this file instead of stdout")
+    parser.add_argument('--backend', choices=sorted(parse_backend.BUILDERS), help="Parse backend (default PARSE_BACKEND)")
+    parser.add_argument('--compare', choices=sorted(parse_backend.BUILDERS), help="Also parse every page with this backend and report differences")
+    args = parser.parse_args()
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            replay(args.cache_dir, args.page_type, args.workers, f, args.backend, args.compare)
+    else:
+        replay(args.cache_dir, args.page_type, args.workers, backend=args.backend, compare=args.compare)
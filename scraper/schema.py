@@ -0,0 +1,116 @@
+import os
+import sys
+import argparse
+import names
+from neo4j.exceptions import Neo4jError, DriverError
+
+# Set SCHEMA_BOOTSTRAP=off to skip creating the schema when the server starts
+SCHEMA_BOOTSTRAP = os.getenv("SCHEMA_BOOTSTRAP", "on") != "off"
+# Seconds to wait for new indexes to come online before verifying plans against them
+SCHEMA_AWAIT_SECONDS = int(os.getenv("SCHEMA_AWAIT_SECONDS", "300"))
+
+# Every key the ingestion queries MERGE or look up on, as (name, label, property, kind)
+#   unique: a uniqueness constraint, which also gives MERGE an index to seek on
+#   range:  keys that repeat - a WTA match id is only the event and the match number, so the same id
+#           (and the score ids built from it) exists once per draw and is told apart by the draw's labels
+#   text:   ids matched with CONTAINS, which range indexes can't serve (STARTS WITH they can)
+SCHEMA = [
+    ('player_id', 'Player', 'id', 'unique'),
+    ('entry_id', 'Entry', 'id', 'unique'),
+    ('event_id', 'Event', 'id', 'unique'),
+    ('country_name', 'Country', 'name', 'unique'),
+    ('year_id', 'Year', 'id', 'unique'),
+    ('umpire_id', 'Umpire', 'id', 'unique'),
+    ('coach_id', 'Coach', 'id', 'unique'),
+    ('match_id', 'Match', 'id', 'range'),
+    ('score_id', 'Score', 'id', 'range'),
+    ('round_id', 'Round', 'id', 'range'),
+    # Cleaned-name keys that coach and umpire names are resolved by (names.py)
+    ('coach_name_key', 'Coach', 'name_key', 'range'),
+    ('coach_full_name_key', 'Coach', 'full_name_key', 'range'),
+    ('umpire_name_key', 'Umpire', 'name_key', 'range'),
+    ('entry_id_text', 'Entry', 'id', 'text')
+]
+
+def statement(name, label, prop, kind):
+    if kind == 'unique':
+        return f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+    return f"CREATE {kind.upper()} INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+
+# Create whatever is missing; safe to run on every start. A constraint the existing data breaks (duplicate keys)
+# is reported and the key gets a range index instead, so lookups still seek until the duplicates are merged
+def bootstrap(graph):
+    report = {}
+    with graph.session() as session:
+        for name, label, prop, kind in SCHEMA:
+            try:
+                session.run(statement(name, label, prop, kind)).consume()
+                report[name] = 'ok'
+            except Neo4jError as e:
+                report[name] = f"{type(e).__name__}: {e.message}"
+                if kind == 'unique':
+                    session.run(statement(f"{name}_range", label, prop, 'range')).consume()
+        session.run("CALL db.awaitIndexes($seconds)", seconds=SCHEMA_AWAIT_SECONDS).consume()
+    return report
+
+def operators(plan):
+    found = [plan['operatorType'].split('@')[0]]
+    for child in plan.get('children', []):
+        found.extend(operators(child))
+    return found
+
+# EXPLAIN each ingestion query (nothing runs) and check its plan starts from an index seek rather than a label or full scan
+#   queries: {name: (query, params)} - see INGESTION_QUERIES in atp_scrapers.py / wta_scrapers.py
+def verify(graph, queries):
+    report = {}
+    with graph.session() as session:
+        for name, (query, params) in queries.items():
+            plan = session.run(f"EXPLAIN {query}", **params).consume().plan
+            ops = operators(plan)
+            seeks = sorted({op for op in ops if 'Seek' in op})
+            scans = sorted({op for op in ops if 'LabelScan' in op or op == 'AllNodesScan'})
+            report[name] = {'ok': bool(seeks) and not scans, 'seeks': seeks, 'scans': scans}
+    return report
+
+# Bootstrap and verify every database at server start, without letting an unreachable database stop the server
+def prepare(graphs):
+    for graph, queries in graphs:
+        try:
+            for name, result in bootstrap(graph).items():
+                if result != 'ok':
+                    print(f"Schema {graph.name}: {name} not created: {result}", file=sys.stderr)
+            names.backfill(graph)
+            for name, result in verify(graph, queries).items():
+                if not result['ok']:
+                    print(f"Schema {graph.name}: {name} does not seek on an index (scans: {', '.join(result['scans']) or 'none'})", file=sys.stderr)
+        except (Neo4jError, DriverError, OSError) as e:
+            print(f"Schema {graph.name}: skipped, {type(e).__name__}: {e}", file=sys.stderr)
+
+if __name__ == "__main__":
+    import atp_scrapers
+    import wta_scrapers
+    import database
+
+    parser = argparse.ArgumentParser(description="Create the Neo4j constraints and indexes and check the ingestion queries use them")
+    parser.add_argument('--database', action='append', choices=['atp', 'wta'])
+    parser.add_argument('--verify-only', action='store_true')
+    args = parser.parse_args()
+
+    graphs = {
+        'atp': (atp_scrapers.graph, atp_scrapers.INGESTION_QUERIES),
+        'wta': (wta_scrapers.graph, wta_scrapers.INGESTION_QUERIES)
+    }
+
+    failed = False
+    for name in args.database or graphs:
+        graph, queries = graphs[name]
+        if not args.verify_only:
+            for key, result in bootstrap(graph).items():
+                print(f"{name} {key}: {result}")
+            for label, count in names.backfill(graph, recompute=True).items():
+                print(f"{name} {label} name keys: {count} nodes")
+        for key, result in verify(graph, queries).items():
+            print(f"{name} {key}: {'index seek' if result['ok'] else 'NO INDEX SEEK'} (seeks: {', '.join(result['seeks']) or 'none'}; scans: {', '.join(result['scans']) or 'none'})")
+            failed = failed or not result['ok']
+    database.close_all()
+    sys.exit(1 if failed else 0)
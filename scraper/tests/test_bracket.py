@@ -0,0 +1,106 @@
+import pytest
+from bracket import Bracket
+from atp_parsers import parse_atp_draw
+from wta_parsers import parse_wta_draw
+
+def test_full_draw_numbers_from_the_final_back():
+    bracket = Bracket(32)
+    assert bracket.sizes == [16, 8, 4, 2, 1]
+    assert bracket.starts == [16, 8, 4, 2, 1]
+    assert bracket.match_no(0, 0) == 16
+    assert bracket.match_no(0, 15) == 31
+
+def test_byes_fill_out_the_first_round():
+    assert Bracket(28, byes=4).sizes == Bracket(32).sizes
+
+# First match number of each qualifying round by draw size, as the ATP site numbers them
+@pytest.mark.parametrize('draw_size, rounds, starts', [
+    (4, 2, [2, 1]),
+    (16, 2, [5, 1]),
+    (24, 2, [7, 1]),
+    (28, 2, [8, 1]),
+    (32, 1, [1]),
+    (48, 2, [13, 1]),
+    (48, 3, [19, 7, 1]),
+    (128, 3, [49, 17, 1])
+])
+def test_qualifying_ladder(draw_size, rounds, starts):
+    assert Bracket(draw_size, rounds).starts == starts
+
+def test_locate_feeders_and_next_match():
+    bracket = Bracket(16)
+    assert bracket.locate(8) == (0, 0)
+    assert bracket.locate(1) == (3, 0)
+    assert bracket.feeders(4) == (8, 9)
+    assert bracket.feeders(8) is None
+    assert bracket.next_match(9) == (4, 2)
+    assert bracket.next_match(1) is None
+    with pytest.raises(ValueError):
+        bracket.locate(16)
+
+def test_progression_covers_every_match_before_the_last_round():
+    progression = Bracket(128, 3).progression()
+    assert len(progression) == 64 + 32
+    assert progression[49] == (17, 1)
+    assert progression[50] == (17, 2)
+    assert progression[17] == (1, 1)
+
+def atp_draw_page(rounds):
+    html = '<div class="atp-draw-container">'
+    for header, matches in rounds:
+        html += f'<div class="draw"><div class="draw-header">{header}</div>'
+        html += '<div class="draw-stats"><div class="name">TBA</div><div class="name">TBA</div></div>' * matches
+        html += '</div>'
+    return html + '</div>'
+
+def test_atp_qualifying_draw_sized_by_the_request():
+    html = atp_draw_page([('1st Round Qualifying', 64), ('2nd Round Qualifying', 32), ('3rd Round Qualifying', 16)])
+    matches = parse_atp_draw(html, {'tid': '580', 'year': '2025', 'type': 'Singles', 'draw': 'Qualifying', 'draw_size': 128})
+    first = {match['round']: match['match_no'] for match in reversed(matches)}
+    assert first == {'Qualifying round 1': 49, 'Qualifying round 2': 17, 'Qualifying round 3': 1}
+    assert matches[0]['id'] == '5802025-ATP S Q 49'
+
+def test_atp_qualifying_draw_sized_by_the_page():
+    html = atp_draw_page([('1st Round Qualifying', 12), ('2nd Round Qualifying', 6)])
+    matches = parse_atp_draw(html, {'tid': '404', 'year': '2025', 'type': 'Singles', 'draw': 'Qualifying'})
+    assert [match['match_no'] for match in matches] == list(range(7, 19)) + list(range(1, 7))
+
+def test_atp_main_draw():
+    html = atp_draw_page([('Round of 32', 16), ('Round of 16', 8), ('Quarter-Finals', 4), ('Semi-Finals', 2), ('Finals', 1)])
+    matches = parse_atp_draw(html, {'tid': '8998', 'year': '2025', 'type': 'Doubles', 'draw': 'Main'})
+    assert [match['match_no'] for match in matches] == list(range(16, 32)) + list(range(8, 16)) + [4, 5, 6, 7, 2, 3, 1]
+
+def wta_draw_page(event_type, rounds):
+    html = f'<section class="tournament-draw"><div class="tournament-draw__tab" data-event-type="{event_type}">'
+    for players in rounds:
+        html += f'<div class="tournament-draw__round-container" data-round="{players}">'
+        html += '<div class="tournament-draw__match-table"></div>' * (players // 2)
+        html += '</div>'
+    return html + '</div></section>'
+
+def first_match_numbers(matches):
+    return {match['round']: match['match_no'] for match in reversed(matches)}
+
+def test_wta_main_draw():
+    matches = parse_wta_draw(wta_draw_page('LS', [32, 16, 8, 4, 2]), {'tid': '2050', 'year': '2025'})
+    assert first_match_numbers(matches) == {'Round of 32': 16, 'Round of 16': 8, 'Quarterfinals': 4, 'Semifinals': 2, 'Final': 1}
+    assert matches[0]['id'] == '20502025-WTA 16'
+
+def test_wta_two_round_qualifying_draw():
+    matches = parse_wta_draw(wta_draw_page('RS', [24, 12]), {'tid': '2050', 'year': '2025'})
+    assert first_match_numbers(matches) == {'Qualifying round 1': 7, 'Qualifying round 2': 1}
+
+# The first round of a three-round RS draw starts after the 12 + 24 matches of the later rounds, not at 96 // 4 + 1
+def test_wta_three_round_qualifying_draw():
+    matches = parse_wta_draw(wta_draw_page('RS', [96, 48, 24]), {'tid': '609', 'year': '2025'})
+    assert first_match_numbers(matches) == {'Qualifying round 1': 37, 'Qualifying round 2': 13, 'Qualifying round 3': 1}
+    assert sorted(match['match_no'] for match in matches) == list(range(1, 85))
+    assert {match['draw'] for match in matches} == {'Qualifying'}
+
+def test_atp_qualifying_draw_without_its_first_round():
+    html = atp_draw_page([('2nd Round Qualifying', 16), ('3rd Round Qualifying', 8)])
+    context = {'tid': '580', 'year': '2025', 'type': 'Singles', 'draw': 'Qualifying'}
+    matches = parse_atp_draw(html, {**context, 'draw_size': 64})
+    assert first_match_numbers(matches) == {'Qualifying round 2': 9, 'Qualifying round 3': 1}
+    with pytest.raises(ValueError, match='5802025'):
+        parse_atp_draw(html, context)
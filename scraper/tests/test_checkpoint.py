@@ -0,0 +1,122 @@
+import json
+import os
+import pytest
+import checkpoint
+from checkpoint import Journal, resume_token
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_DIR', str(tmp_path))
+    return tmp_path
+
+class Writes:
+    def __init__(self):
+        self.chunks = []
+
+    def __call__(self, chunk):
+        self.chunks.append(list(chunk))
+
+def test_resume_token_is_stable_and_ignores_control_fields():
+    data = {'tid': '580', 'year': '2025', 'type': 'Singles'}
+    token = resume_token('draw', data)
+    assert len(token) == 16
+    assert resume_token('draw', dict(reversed(list(data.items())))) == token
+    assert resume_token('draw', {**data, 'async': True, 'resume': True, 'concurrency': 4}) == token
+    assert resume_token('stats', data) != token
+    assert resume_token('draw', {**data, 'year': '2024'}) != token
+
+def test_flushes_every_flush_size_records():
+    writes = Writes()
+    journal = Journal('draw', {'tid': '1'}, writes, flush_size=2)
+    for n in range(5):
+        journal.add({'link': n}, {'record': n})
+    assert writes.chunks == [[{'record': 0}, {'record': 1}], [{'record': 2}, {'record': 3}]]
+    journal.finish(complete=False)
+    assert writes.chunks[-1] == [{'record': 4}]
+    assert os.path.exists(journal.path)
+
+def test_finish_complete_removes_the_journal():
+    journal = Journal('draw', {'tid': '1'}, Writes(), flush_size=10)
+    journal.add('a', 1)
+    journal.finish(complete=True)
+    assert not os.path.exists(journal.path)
+
+def test_resume_picks_up_records_and_flushed_count():
+    data = {'tid': '1'}
+    first = Writes()
+    journal = Journal('draw', data, first, flush_size=2)
+    for n in range(3):
+        journal.add({'link': n}, n)
+    journal._file.close()
+    assert first.chunks == [[0, 1]]
+
+    second = Writes()
+    resumed = Journal('draw', {**data, 'resume': True}, second, flush_size=2)
+    assert resumed.path == journal.path
+    assert resumed.records == [0, 1, 2]
+    assert resumed.flushed == 2
+    assert resumed.pending([{'link': n} for n in range(5)]) == [{'link': 3}, {'link': 4}]
+
+    resumed.add({'link': 3}, 3)
+    resumed.finish(complete=True)
+    assert second.chunks == [[2, 3]]
+
+def test_resume_by_token():
+    journal = Journal('stats', {'tid': '1'}, Writes())
+    journal.add('a', 1)
+    journal._file.close()
+    resumed = Journal('stats', {'resume': journal.token}, Writes())
+    assert resumed.records == [1]
+    resumed.finish(complete=True)
+
+def test_resume_skips_a_truncated_line():
+    journal = Journal('draw', {'tid': '1'}, Writes(), flush_size=10)
+    journal.add('a', 1)
+    journal._file.write(json.dumps({'item': 'b', 'record': 2})[:-5])
+    journal._file.close()
+
+    resumed = Journal('draw', {'tid': '1', 'resume': True}, Writes())
+    assert resumed.records == [1]
+    assert resumed.pending(['a', 'b']) == ['b']
+    resumed.finish(complete=True)
+
+def test_resume_without_a_journal_starts_fresh():
+    resumed = Journal('draw', {'tid': '2', 'resume': True}, Writes())
+    assert resumed.records == []
+    assert resumed.flushed == 0
+    resumed.finish(complete=True)
+
+def test_records_a_write_hands_back_are_scraped_again_on_resume():
+    data = {'tid': '3'}
+    journal = Journal('stats', data, lambda chunk: [record for record in chunk if record['n'] == 1], flush_size=10)
+    for n in range(3):
+        journal.add({'link': n}, {'n': n})
+    journal.finish(complete=True)
+    assert journal.unwritten == 1
+    assert os.path.exists(journal.path)
+
+    writes = Writes()
+    resumed = Journal('stats', {**data, 'resume': True}, writes, flush_size=10)
+    assert resumed.flushed == 3
+    assert resumed.pending([{'link': n} for n in range(3)]) == [{'link': 1}]
+    resumed.add({'link': 1}, {'n': 1})
+    resumed.finish(complete=True)
+    assert writes.chunks == [[{'n': 1}]]
+    assert not os.path.exists(resumed.path)
+
+def test_a_failed_write_is_not_counted_as_flushed():
+    def write(chunk):
+        raise RuntimeError("insert failed")
+
+    journal = Journal('stats', {'tid': '4'}, write, flush_size=2)
+    journal.add('a', 1)
+    with pytest.raises(RuntimeError):
+        journal.add('b', 2)
+    assert journal.flushed == 0
+    journal._file.close()
+
+    writes = Writes()
+    resumed = Journal('stats', {'tid': '4', 'resume': True}, writes)
+    assert resumed.pending(['a', 'b']) == []
+    resumed.finish(complete=True)
+    assert writes.chunks == [[1, 2]]
@@ -0,0 +1,88 @@
+import pytest
+from cypher_batch import Batch, StreamWriter, statement
+
+# A database handle that runs each transaction function against a recording transaction, as database.py's pool would
+class Transaction:
+    def __init__(self, runs):
+        self.runs = runs
+
+    def run(self, query, **params):
+        self.runs.append((query, params))
+        return self
+
+    def consume(self):
+        pass
+
+class Graph:
+    def __init__(self, fail_after=None):
+        self.runs = []
+        self.fail_after = fail_after
+
+    def write(self, fn, *args):
+        if self.fail_after is not None and len(self.runs) >= self.fail_after:
+            raise RuntimeError("write failed")
+        return fn(Transaction(self.runs), *args)
+
+def chunks(graph):
+    return [(query, params.pop('rows'), params) for query, params in graph.runs]
+
+def test_statement_unwinds_rows():
+    assert statement("MERGE (n {id: row.id})") == "CYPHER 25\nUNWIND $rows AS row\nMERGE (n {id: row.id})"
+
+def test_groups_by_template_and_params_in_first_seen_order():
+    batch = Batch(batch_size=10)
+    batch.add('MATCH', {'id': 1}, type='Singles', labels=('ATP', 'Main'))
+    batch.add('SCORE', {'id': 2}, type='Singles')
+    batch.add('MATCH', {'id': 3}, labels=('ATP', 'Main'), type='Singles')
+    batch.add('MATCH', {'id': 4}, type='Doubles', labels=('ATP', 'Main'))
+    assert len(batch) == 4
+
+    graph = Graph()
+    assert batch.write(graph) == 4
+    assert chunks(graph) == [
+        (statement('MATCH'), [{'id': 1}, {'id': 3}], {'labels': ('ATP', 'Main'), 'type': 'Singles'}),
+        (statement('SCORE'), [{'id': 2}], {'type': 'Singles'}),
+        (statement('MATCH'), [{'id': 4}], {'labels': ('ATP', 'Main'), 'type': 'Doubles'})
+    ]
+
+def test_chunks_each_group_by_batch_size():
+    batch = Batch(batch_size=3)
+    for n in range(7):
+        batch.add('A', n)
+    batch.add('B', 'b')
+    graph = Graph()
+    assert batch.write(graph) == 8
+    assert [(query, rows) for query, rows, _ in chunks(graph)] == [
+        (statement('A'), [0, 1, 2]),
+        (statement('A'), [3, 4, 5]),
+        (statement('A'), [6]),
+        (statement('B'), ['b'])
+    ]
+
+def test_failed_chunk_raises_after_earlier_chunks_committed():
+    batch = Batch(batch_size=2)
+    for n in range(5):
+        batch.add('A', n)
+    graph = Graph(fail_after=2)
+    with pytest.raises(RuntimeError):
+        batch.write(graph)
+    assert [rows for _, rows, _ in chunks(graph)] == [[0, 1], [2, 3]]
+
+def test_stream_writer_flushes_at_batch_size():
+    graph = Graph()
+    writer = StreamWriter(graph, batch_size=3)
+    writer.add('A', 1)
+    writer.add('B', 2, draw='Main')
+    assert graph.runs == []
+    writer.add('A', 3)
+    assert [rows for _, rows, _ in chunks(graph)] == [[1, 3], [2]]
+
+    graph.runs.clear()
+    writer.add('B', 4, draw='Main')
+    assert writer.close() == 4
+    assert [rows for _, rows, _ in chunks(graph)] == [[4]]
+
+def test_stream_writer_close_without_rows():
+    graph = Graph()
+    assert StreamWriter(graph).close() == 0
+    assert graph.runs == []
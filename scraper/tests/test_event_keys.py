@@ -0,0 +1,82 @@
+from event_keys import EventKeys, ScoreKeys, resolve_event_keys, resolve_score_keys
+
+# A transaction that answers each query by the node label it matches on
+class Transaction:
+    def __init__(self, results):
+        self.results = results
+        self.params = []
+
+    def run(self, query, **params):
+        self.params.append(params)
+        return [record for label, records in self.results.items() if f":{label})" in query for record in records]
+
+EID = '5802025-ATP'
+
+def event_transaction():
+    return Transaction({
+        'Round': [
+            {'id': f'{EID} S M R1', 'round': 'Round of 128', 'labels': ['Round', 'Singles', 'Main']},
+            {'id': f'{EID} D M R1', 'round': 'Round of 128', 'labels': ['Round', 'Doubles', 'Main']},
+            {'id': f'{EID} S Q R1', 'round': 'Qualifying round 1', 'labels': ['Round', 'Singles', 'Qualifying']}
+        ],
+        'Entry': [
+            {'id': f'{EID} a1 b2', 'labels': ['Entry', 'Doubles']},
+            {'id': f'{EID} c3', 'labels': ['Entry', 'Singles']}
+        ],
+        'Match': [
+            {'id': f'{EID} S M 1', 'match_no': 1, 'labels': ['Match', 'ATP', 'Singles', 'Main']},
+            {'id': f'{EID} D M 1', 'match_no': 1, 'labels': ['Match', 'ATP', 'Doubles', 'Main']}
+        ]
+    })
+
+def test_resolve_event_keys():
+    tx = event_transaction()
+    keys = resolve_event_keys(tx, EID)
+    assert tx.params == [{'eid': EID}] * 3
+
+    assert keys.round('Round of 128', 'Singles', 'Main') == f'{EID} S M R1'
+    assert keys.round('Round of 128', 'Doubles') == f'{EID} D M R1'
+    assert keys.round('Round of 128', 'Singles', 'Qualifying') is None
+    assert keys.round('Final', 'Singles') is None
+
+    assert keys.entry(['b2', 'a1'], 'Doubles') == f'{EID} a1 b2'
+    assert keys.entry(('a1', 'b2'), 'Doubles') == f'{EID} a1 b2'
+    assert keys.entry(['c3'], 'Singles') == f'{EID} c3'
+    assert keys.entry(['c3'], 'Doubles') is None
+
+    assert keys.match(1, 'Match', 'ATP', 'Doubles', 'Main') == f'{EID} D M 1'
+    assert keys.match(1, 'Singles') == f'{EID} S M 1'
+    assert keys.match(2, 'Singles') is None
+
+def test_pick_returns_the_first_node_with_every_label():
+    keys = EventKeys(EID)
+    keys.add(keys.matches, 7, 'first', ['Match', 'Main'])
+    keys.add(keys.matches, 7, 'second', ['Match', 'Main', 'Singles'])
+    assert keys.match(7, 'Main') == 'first'
+    assert keys.match(7, 'Singles') == 'second'
+    assert keys.match(7) == 'first'
+
+def test_score_pairs():
+    keys = ScoreKeys()
+    keys.add('M1 p1', 'M1')
+    keys.add('M1 p2', 'M1')
+    keys.add('M2 p1 p3', 'M2')
+    keys.add('M2 p2 p4', 'M2')
+    keys.add('M3 p1', 'M3')
+    assert keys.pairs('p1', 'p2') == [('M1', 'M1 p1', 'M1 p2'), ('M2', 'M2 p1 p3', 'M2 p2 p4')]
+    assert keys.pairs('p2', 'p1') == [('M1', 'M1 p2', 'M1 p1'), ('M2', 'M2 p2 p4', 'M2 p1 p3')]
+    # Doubles partners share a Score, so they never face each other
+    assert keys.pairs('p1', 'p3') == []
+    assert keys.pairs('p1', 'p9') == []
+
+def test_resolve_score_keys_keeps_scores_with_every_label():
+    tx = Transaction({'Score': [
+        {'id': '2050-WTA 1 p1', 'match': '2050-WTA 1', 'labels': ['Score', 'WTA', 'Main']},
+        {'id': '2050-WTA 1 p2', 'match': '2050-WTA 1', 'labels': ['Score', 'WTA', 'Main']},
+        {'id': '2050-WTA 1 p5', 'match': '2050-WTA 1', 'labels': ['Score', 'WTA', 'Qualifying']},
+        {'id': '2050-WTA 1 p6', 'match': '2050-WTA 1', 'labels': ['Score', 'WTA', 'Qualifying']}
+    ]})
+    keys = resolve_score_keys(tx, '2050-WTA ', 'WTA', 'Main')
+    assert tx.params == [{'prefix': '2050-WTA '}]
+    assert keys.pairs('p1', 'p2') == [('2050-WTA 1', '2050-WTA 1 p1', '2050-WTA 1 p2')]
+    assert keys.pairs('p5', 'p6') == []
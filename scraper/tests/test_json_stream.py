@@ -0,0 +1,68 @@
+import json
+import pytest
+import json_stream
+from json_stream import iter_records
+
+# Reads of a few characters, so strings, numbers and nesting are cut at every possible point
+@pytest.fixture(params=[1, 2, 3, 7, 1 << 16])
+def read_size(request, monkeypatch):
+    monkeypatch.setattr(json_stream, 'READ_SIZE', request.param)
+    return request.param
+
+RECORDS = [
+    {'id': 'a', 'score': 1234567, 'sets': [6, 4, 7.5], 'name': 'Ana Ivanović'},
+    {'id': 'b', 'score': -12e3, 'note': None, 'nested': {'x': [1, {'y': 'z, ]'}]}},
+    {'id': 'c', 'score': 0, 'ok': True}
+]
+
+def write(tmp_path, text, name='records.json'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_array(tmp_path, read_size):
+    path = write(tmp_path, json.dumps(RECORDS, indent=2))
+    assert list(iter_records(path)) == RECORDS
+
+def test_array_of_numbers_split_across_reads(tmp_path, read_size):
+    numbers = [123456789, 98765.4321, -1, 0, 10 ** 20]
+    path = write(tmp_path, json.dumps(numbers))
+    assert list(iter_records(path)) == numbers
+
+def test_empty_array(tmp_path, read_size):
+    path = write(tmp_path, '  [ ]  ')
+    assert list(iter_records(path)) == []
+
+def test_pointer_into_nested_array(tmp_path, read_size):
+    document = [{'skip': [1, 2, {'match': ['no']}]}, {'other': 'x', 'match': RECORDS, 'after': [3]}]
+    path = write(tmp_path, json.dumps(document))
+    assert list(iter_records(path, (1, 'match'))) == RECORDS
+    assert list(iter_records(path, (0, 'skip'))) == [1, 2, {'match': ['no']}]
+
+def test_pointer_to_first_item(tmp_path, read_size):
+    path = write(tmp_path, json.dumps([{'match': RECORDS}]))
+    assert list(iter_records(path, (0, 'match'))) == RECORDS
+
+def test_missing_key(tmp_path, read_size):
+    path = write(tmp_path, json.dumps([{'matches': []}]))
+    with pytest.raises(KeyError):
+        list(iter_records(path, (0, 'match')))
+
+def test_wrong_container(tmp_path, read_size):
+    path = write(tmp_path, json.dumps({'match': []}))
+    with pytest.raises(ValueError):
+        list(iter_records(path, (0,)))
+
+def test_ndjson(tmp_path, read_size):
+    path = write(tmp_path, '\n'.join(json.dumps(record) for record in RECORDS) + '\n\n', 'records.ndjson')
+    assert list(iter_records(path)) == RECORDS
+
+def test_ndjson_first_record_longer_than_a_read(tmp_path, read_size):
+    records = [{'id': 'x' * 100}, {'id': 'y'}]
+    path = write(tmp_path, '\n' + '\n'.join(json.dumps(record) for record in records), 'records.ndjson')
+    assert list(iter_records(path)) == records
+
+def test_truncated_array(tmp_path, read_size):
+    path = write(tmp_path, json.dumps(RECORDS)[:-20])
+    with pytest.raises(ValueError):
+        list(iter_records(path))
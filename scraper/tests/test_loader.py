@@ -0,0 +1,44 @@
+from event_keys import EventKeys
+from loader import write_scores, entry_players
+
+class Writer:
+    name = 'scores'
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, template, row, **params):
+        self.rows.append(row)
+
+EID = '5402025-WTA'
+
+def event_keys():
+    keys = EventKeys(EID)
+    keys.add(keys.matches, 1, f'{EID} S M 1', ['Match', 'WTA', 'Singles', 'Main'])
+    keys.add(keys.entries, frozenset(['320760']), f'{EID} 320760', ['Entry', 'Singles'])
+    keys.add(keys.entries, frozenset(['328560']), f'{EID} 328560', ['Entry', 'Singles'])
+    return keys
+
+def score(entry1, entry2):
+    return {
+        'match_no': 1,
+        'entry1': entry1,
+        'entry2': entry2,
+        'score1_properties': {'id': f'{EID} S M 1 320760'},
+        'score2_properties': {'id': f'{EID} S M 1 328560'},
+        'score1_labels': ['Score'],
+        'score2_labels': ['Score']
+    }
+
+def test_entry_players():
+    assert entry_players('320760') == ['320760']
+    assert entry_players(320760) == ['320760']
+    assert entry_players(['a1', 'b2']) == ['a1', 'b2']
+
+def test_singles_entries_given_as_one_id_or_a_list():
+    job = {'tour': 'WTA', 'type': 'Singles', 'draw': 'Main'}
+    writer = Writer()
+    summary = {'records': 0, 'skipped': 0}
+    write_scores(writer, event_keys(), [score('320760', '328560'), score(['320760'], [328560])], job, summary)
+    assert summary == {'records': 2, 'skipped': 0}
+    assert [(row['entry1'], row['entry2']) for row in writer.rows] == [(f'{EID} 320760', f'{EID} 328560')] * 2
@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+from contextlib import contextmanager
+import metrics
+
+# Request budget per host
+#   rate:        requests per second the host starts at
+#   min_rate / max_rate: bounds the adaptive rate moves between
+#   burst:       requests that may go out back to back after an idle spell
+#   concurrency: requests in flight at once
+# Any setting can be overridden with THROTTLE_<HOST>_<SETTING>, e.g. THROTTLE_ATPTOUR_RATE=1.5
+HOST_LIMITS = {
+    'atptour.com': {'rate': 2.0, 'min_rate': 0.2, 'max_rate': 6.0, 'burst': 4, 'concurrency': 4},
+    'wtatennis.com': {'rate': 2.0, 'min_rate': 0.2, 'max_rate': 6.0, 'burst': 4, 'concurrency': 4}
+}
+DEFAULT_LIMITS = {'rate': 4.0, 'min_rate': 0.5, 'max_rate': 10.0, 'burst': 8, 'concurrency': 8}
+
+# Responses slower than this count as the host struggling, and the rate backs off
+THROTTLE_SLOW_SECONDS = float(os.getenv("THROTTLE_SLOW_SECONDS", "8"))
+# How long all requests to a host pause after it throttles or blocks us (unless it sends Retry-After)
+THROTTLE_COOLDOWN = float(os.getenv("THROTTLE_COOLDOWN", "30"))
+
+# Status codes a host uses to say we're going too fast or have been blocked
+BLOCKED_STATUSES = {403, 429, 503}
+
+def host_for(url):
+    host = urlsplit(url).netloc.lower().split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+def limits_for(host):
+    limits = dict(HOST_LIMITS.get(host, DEFAULT_LIMITS))
+    prefix = f"THROTTLE_{host.split('.')[0].upper()}_"
+    for setting, value in limits.items():
+        override = os.getenv(prefix + setting.upper())
+        if override:
+            limits[setting] = type(value)(override)
+    return limits
+
+# What a request reports back when it finishes, so the host's rate can adapt
+class Outcome:
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+        self.elapsed = None
+
+    # Time only the request itself when the slot covers more than it - a browser render leases a driver and waits
+    # for the page's data after navigating, and neither says anything about how the host is coping
+    @contextmanager
+    def timing(self):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.elapsed = time.monotonic() - started
+
+# Token bucket plus concurrency limit for one host, with additive-increase/multiplicative-decrease on the rate
+class HostThrottle:
+    def __init__(self, host, limits):
+        self.host = host
+        self.rate = limits['rate']
+        self.min_rate = limits['min_rate']
+        self.max_rate = limits['max_rate']
+        self.burst = limits['burst']
+        self.concurrency = limits['concurrency']
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self._paused_until and self._in_flight < self.concurrency and self._tokens >= 1:
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        break
+
+                    # Sleep until the next token is due, the pause ends, or a slot frees up
+                    if now < self._paused_until:
+                        delay = self._paused_until - now
+                    elif self._tokens < 1:
+                        delay = (1 - self._tokens) / self.rate
+                    else:
+                        delay = None
+                    self._condition.wait(delay)
+            finally:
+                self._waiting -= 1
+
+        metrics.record_timing(f"throttle.{self.host}.queued", time.monotonic() - started)
+
+    def release(self, outcome, elapsed, failed):
+        with self._condition:
+            self._in_flight -= 1
+
+            if outcome.status in BLOCKED_STATUSES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._paused_until = time.monotonic() + (outcome.retry_after or THROTTLE_COOLDOWN)
+                metrics.increment(f"throttle.{self.host}.blocked")
+            elif failed or elapsed > THROTTLE_SLOW_SECONDS:
+                self.rate = max(self.min_rate, self.rate * 0.75)
+                metrics.increment(f"throttle.{self.host}.backoff")
+            else:
+                # Creep back up by roughly one request per second every ten good responses
+                self.rate = min(self.max_rate, self.rate + 0.1)
+
+            self._condition.notify_all()
+
+        metrics.record_timing(f"throttle.{self.host}.latency", elapsed)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'rate': round(self.rate, 2),
+                'concurrency': self.concurrency,
+                'in_flight': self._in_flight,
+                'queued': self._waiting,
+                'paused_for': round(max(0, self._paused_until - time.monotonic()), 1)
+            }
+
+# Process-wide scheduler every fetch goes through, one throttle per host
+class Scheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def throttle(self, url):
+        host = host_for(url)
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostThrottle(host, limits_for(host))
+            return self._hosts[host]
+
+    # Wait for the host's budget, then time the request made inside the block (or the part of it under outcome.timing())
+    # Set outcome.status (and retry_after) for HTTP responses; an exception counts as a failure
+    @contextmanager
+    def slot(self, url):
+        throttle = self.throttle(url)
+        throttle.acquire()
+        outcome = Outcome()
+        started = time.monotonic()
+        failed = True
+        try:
+            yield outcome
+            failed = outcome.status is not None and outcome.status >= 500
+        finally:
+            elapsed = outcome.elapsed if outcome.elapsed is not None else time.monotonic() - started
+            throttle.release(outcome, elapsed, failed)
+
+    def stats(self):
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: throttle.stats() for host, throttle in hosts.items()}
+
+scheduler = Scheduler()
+metrics.register_gauge('throttle', scheduler.stats)
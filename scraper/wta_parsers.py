@@ -0,0 +1,298 @@
+from bracket import Bracket
+from parse_backend import make_soup, subtrees, release
+from datetime import datetime
+import re
+import json
+
+# Parsers turn a stored page into the records its endpoint writes. They only need the HTML and the
+# request context saved with it, so pages can be re-parsed offline without a browser (see replay.py)
+
+def parse_wta_player(html, context):
+    player = { 'id': context['player_id'] }
+
+    page = make_soup(html)
+
+    header = page.find(class_='page-hero')
+    main = page.find(class_='page-content')
+
+    stats_block = header.select_one('section')
+    script_block = header.find('script', type='application/ld+json')
+    name_tag = header.select_one('h1.profile-header__name')
+    country = ""
+    bio_block = main.find_all('div', class_ = 'profile-bio__info-block')
+
+    if stats_block:
+        stats_details = stats_block.get('data-player-stats')
+        if stats_details:
+            parsed = json.loads(stats_details)
+            career_stats = parsed['career']
+            ytd_stats = parsed['ytd']
+
+            singlesHighRank = career_stats['singles']['highRankDate']
+            singlesDate = datetime.strptime(singlesHighRank, "%d %b %y") if singlesHighRank else None
+            player['singles_ch_date'] = singlesDate.strftime("%Y-%m-%d")
+            doublesHighRank = career_stats['doubles']['highRankDate']
+            doublesDate = datetime.strptime(doublesHighRank, "%d %b %y") if doublesHighRank else None
+            player['doubles_ch_date'] = doublesDate.strftime("%Y-%m-%d")
+            player['ch_singles'] = None if career_stats['singles']['rank'] == '-' else int(career_stats['singles']['rank'])
+            player['ch_doubles'] = None if career_stats['doubles']['rank'] == '-' else int(career_stats['doubles']['rank'])
+            player['pm'] = 0 if career_stats['prizeMoney'] == '-' else int(career_stats['prizeMoney'])
+
+            player['current_singles'] = None if ytd_stats['singles']['rank'] == '-' else int(ytd_stats['singles']['rank'])
+            player['current_doubles'] = None if ytd_stats['doubles']['rank'] == '-' else int(ytd_stats['doubles']['rank'])
+
+    else:
+        print("No stats block found")
+
+    if script_block:
+        country_mapping = {
+            'Czech Republic': 'Czechia',
+            'The Netherlands': 'Netherlands',
+            'Republic of Egypt': 'Egypt',
+            'Korea (South)': 'South Korea',
+            'Macedonia': 'North Macedonia',
+            'Hong-Kong, China': 'Hong Kong'
+        }
+        try:
+            data = json.loads(script_block.string)
+            country_text = data.get('nationality')
+            country = country_mapping[country_text] if country_text in country_mapping else country_text
+            player['dob'] = data.get('birthDate')
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON: {e}")
+    else:
+        print("No script block found")
+
+    if name_tag:
+        parts = list(name_tag.stripped_strings)
+        player['first_name'], player['last_name'] = parts
+    else:
+        print("No name tag found")
+
+    if bio_block:
+        plays_detail = bio_block[0].find('span', class_ = 'profile-bio__info-content')
+        if plays_detail:
+            plays = plays_detail.get_text(strip=True)
+            player['rh'] = 'Right' if plays == 'Right-Handed' else 'Left' if plays == 'Left-Handed' else None
+
+        height_detail = bio_block[2].find('span', class_ = 'profile-bio__info-content')
+        if height_detail:
+            height_m_string = re.search(r'(\d+(?:\.\d+)?\s*m)', height_detail.get_text(strip=True))
+            if height_m_string:
+                m_str = height_m_string.group(1)
+                meters = float(m_str.rstrip('m'))
+                player['height'] = int(meters * 100)
+
+    return {'player': player, 'country': country}
+
+def parse_wta_draw(html, context):
+    tid = context['tid']
+    year = context['year']
+    matches = []
+
+    # Each draw tab is parsed on its own and freed once its matches are read
+    draw_containers = subtrees(html, 'tournament-draw__tab', 'div')
+
+    for draw_layout in draw_containers:
+        draw_type = draw_layout.get('data-event-type')
+        draw_mapping = {
+            'LS': ['Main', 'Singles'],
+            'LD': ['Main', 'Doubles'],
+            'RS': ['Qualifying', 'Singles']
+        }
+
+        round_mapping = {
+            128: 'Round of 128',
+            64: 'Round of 64',
+            32: 'Round of 32',
+            16: 'Round of 16',
+            8: 'Quarterfinals',
+            4: 'Semifinals',
+            2: 'Final'
+        }
+
+        rounds = draw_layout.find_all('div', class_ = 'tournament-draw__round-container')
+
+        # data-round is the number of players in the round, so the largest one sizes the bracket;
+        # a qualifying (RS) draw stops after the rounds shown
+        first_round = max((int(round.get('data-round')) for round in rounds), default=0)
+        bracket = Bracket(first_round, len(rounds) if draw_type == 'RS' else None)
+
+        for idx, round in enumerate(rounds):
+            round_number = int(round.get('data-round'))
+            round_name = round_mapping.get(round_number) if draw_type != 'RS' else f"Qualifying round {idx + 1}"
+
+            matches_container = round.find_all('div', class_ = 'tournament-draw__match-table')
+
+            for index, match_container in enumerate(matches_container):
+                match_no = bracket.match_no(idx if draw_type == 'RS' else bracket.sizes.index(round_number // 2), index)
+
+                match_info = {
+                    'eid': f"{tid}{year}-WTA",
+                    'id': f"{tid}{year}-WTA {match_no}",
+                    'draw': draw_mapping[draw_type][0],
+                    'type': draw_mapping[draw_type][1],
+                    'match_no': match_no,
+                    'round': round_name,
+                    'p1': None,
+                    'p2': None,
+                    'p3': None,
+                    'p4': None,
+                    'p1_seed': None,
+                    'p2_seed': None,
+                    'p1_score': {},
+                    'p2_score': {},
+                    'bye': False,
+                    'winner': None
+                }
+
+                match = match_container.find('div', class_ = 'js-tennis-match-wta')
+                if match:
+                    match_info['winner'] = match.get('data-winner-id')
+
+                    player_rows = match.find_all('tr', class_ = 'match-table__row')
+
+                    for i, player_row in enumerate(player_rows):
+                        player_data_ids = player_row.get('data-player-row-id')
+                        if player_data_ids == 'player':
+                            match_info['bye'] = True
+                        else:
+                            player_ids = player_data_ids.removeprefix('player-').split('-')
+                            match_info[f"p{i + 1}"] = player_ids[0]
+                            if len(player_ids) > 1:
+                                match_info[f"p{i + 3}"] = player_ids[1]
+
+                            seed_tag = player_row.find('span', class_ = 'match-table__player-seed')
+                            if seed_tag:
+                                seed_text = seed_tag.get_text(strip=True).strip("()")
+                                match_info[f"p{i + 1}_seed"] = int(seed_text) if seed_text.isdigit() else None
+
+                            for j in range(1, 4):
+                                score_tag = player_row.find('td', class_ = f"js-score-set-{j}{'a' if i == 0 else 'b'}")
+
+                                if score_tag:
+                                    # Extract tie-break text if it exists
+                                    tb_tag = score_tag.find('sup', class_="match-table__tie-break")
+                                    if tb_tag:
+                                        tb_text = tb_tag.get_text(strip=True)
+                                        match_info[f"p{i + 1}_score"][f't{j}'] = int(tb_text)
+                                        tb_tag.decompose()  # Remove the <sup> tag from score_tag so it doesn't affect .get_text()
+
+                                    score_text = score_tag.get_text(strip=True)
+                                    if score_text:
+                                        match_info[f"p{i + 1}_score"][f's{j}'] = int(score_text) if score_text.isdigit() else None
+                matches.append(match_info)
+
+        release(draw_layout)
+
+    return matches
+
+# Rows of the Service stats block as [player 1, label, player 2], or None when the match has no stats
+def wta_service_rows(match_stats_soup):
+    match_stats = match_stats_soup.find('div', class_ = 'js-match-stats')
+    service_stats = match_stats.find('h3', string= 'Service')
+    if not service_stats:
+        return None
+
+    stats_block = service_stats.find_next_sibling('div', class_ = 'compare-stats-block__list')
+    return [
+        [column.get_text(strip=True) for column in row.find_all('div', class_ = 'compare-stats-block__content-col')]
+        for row in stats_block.find_all('div', class_ = 'compare-stats-block__row')
+    ]
+
+# Fields the match parser reads: the JSON stored by the in-browser extractor (extractors.py), or the same fields read from HTML
+def wta_match_fields(html):
+    if html.lstrip().startswith('{'):
+        return json.loads(html)
+
+    page = make_soup(html)
+    match_soup = page.select_one('section.mc-live-score')
+    match_info_soup = page.find(id='match-details')
+
+    def text(tag):
+        return tag.get_text(strip=True) if tag else None
+
+    return {
+        'player_ids': match_soup.get('data-player-ids'),
+        'status_time': text(match_soup.find('div', class_ = 'tennis-match__status-time')),
+        'details': [
+            {
+                'title': text(detail.find('div', class_ = 'match-info__title')),
+                'value': text(detail.find('div', class_ = 'match-info__value'))
+            }
+            for detail in match_info_soup.find_all('div', class_ = 'match-info__row')
+        ],
+        'service': wta_service_rows(page.find(id='match-stats'))
+    }
+
+def parse_wta_match(html, context):
+    fields = wta_match_fields(html)
+
+    match_info = {
+        'p1': {},
+        'p2': {}
+    }
+
+    # Get match details
+    match_info['p1_id'], match_info['p2_id'] = fields['player_ids'].split(', ')
+    match_time = fields['status_time']
+    match_info['hours'], match_info['minutes'] = map(int, match_time.removeprefix('Finished: ').split(':'))
+    for detail in fields['details']:
+        if detail['title'] == 'Start Time':
+            long_date = detail['value']
+            parsed_date = datetime.strptime(long_date, "%a %d %b %Y")
+            match_info['date'] = parsed_date.strftime("%Y-%m-%d")
+        elif detail['title'] == 'Court':
+            court_string = detail['value']
+            if court_string != '-':
+                match_info['court'] = court_string
+
+
+    # Get stats
+    if fields['service'] is not None:
+        stats_dictionary = {
+            'Aces': 'aces',
+            'Double Faults': 'dfs',
+            '1st Serve Points Won': ['serve1_w', 'serve1', 'ret1_w', 'ret1'],
+            '2nd Serve Points Won': ['serve2_w', 'serve2', 'ret2_w', 'ret2'],
+            'Break Points Saved': ['bps_saved', 'bps_faced', 'bps_converted', 'bp_opps'],
+            'Service Games Played': ['serve_games', 'return_games']
+        }
+
+        for columns in fields['service']:
+            label = columns[1]
+
+            if stats_dictionary.get(label) is not None:
+                p1_stat = columns[0]
+                p2_stat = columns[2]
+
+                if label in ('Aces', 'Double Faults'):
+                    key = stats_dictionary[label]
+                    match_info['p1'][key] = int(p1_stat)
+                    match_info['p2'][key] = int(p2_stat)
+                elif label == 'Service Games Played':
+                    key1, key2 = stats_dictionary[label]
+                    match_info['p1'][key1] = int(p1_stat)
+                    match_info['p2'][key1] = int(p2_stat)
+                    match_info['p1'][key2] = int(p2_stat)
+                    match_info['p2'][key2] = int(p1_stat)
+                else:
+                    key1, key2, key3, key4 = stats_dictionary[label]
+                    p1_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p1_stat)
+                    p2_stripped = re.search(r'\b(\d{1,3})/(\d{1,3})\b', p2_stat)
+                    match_info['p1'][key1] = int(p1_stripped.group(1))
+                    match_info['p1'][key2] = int(p1_stripped.group(2))
+                    match_info['p2'][key3] = int(p1_stripped.group(2)) - int(p1_stripped.group(1))
+                    match_info['p2'][key4] = int(p1_stripped.group(2))
+                    match_info['p2'][key1] = int(p2_stripped.group(1))
+                    match_info['p2'][key2] = int(p2_stripped.group(2))
+                    match_info['p1'][key3] = int(p2_stripped.group(2)) - int(p2_stripped.group(1))
+                    match_info['p1'][key4] = int(p2_stripped.group(2))
+    return match_info
+
+# Parser for each stored page type
+PARSERS = {
+    'wta_player': parse_wta_player,
+    'wta_draw': parse_wta_draw,
+    'wta_match': parse_wta_match
+}